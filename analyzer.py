@@ -0,0 +1,127 @@
+# analyzer.py
+import re
+import sys
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Words, joined across a dot, dash or slash when the next part contains a
+# digit, so part numbers like "0x1F", "v2.3" or "RS-485" stay one token while
+# "error-code" splits into two words
+TOKEN_PATTERN = r"\w+(?:[.\-/](?=\w*\d)\w+)*"
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be but by for from had has have he her his i if in into is it its
+of on or our she so such that the their then there these they this to was we were
+what when which while who will with you your
+""".split())
+
+
+def light_stem(word: str) -> str:
+    """
+    Harman's S-stemmer: strip plural endings only
+
+    Conservative enough that it rarely conflates unrelated words, which
+    suits technical text full of part names and identifiers.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies") and not word.endswith(("eies", "aies")):
+        return word[:-3] + "y"
+    if word.endswith("es") and not word.endswith(("aes", "ees", "oes")):
+        return word[:-1]
+    if word.endswith("s") and not word.endswith(("us", "ss")):
+        return word[:-1]
+    return word
+
+
+class _TermCache(dict):
+    """token -> term map that fills itself in; dropped tokens map to an empty string"""
+
+    def __init__(self, analyzer):
+        super().__init__()
+        self.analyzer = analyzer
+
+    def __missing__(self, token):
+        term = self[token] = self.analyzer._term(token)
+        return term
+
+
+class Analyzer:
+    """
+    Turns text into index terms, the same way for chunks and queries
+
+    Text is Unicode-normalized (NFKC) and case-folded in one pass, split
+    with a precompiled regex, and each distinct token is then mapped once
+    through the stopword list and stemmer. That per-token result is cached
+    and interned, so analyzing a large corpus mostly costs a regex scan and
+    a dict lookup per token.
+    """
+
+    def __init__(self, pattern: str = TOKEN_PATTERN, normalization: Optional[str] = "NFKC",
+                 stopwords: Iterable[str] = ENGLISH_STOPWORDS, stem: bool = True,
+                 min_length: int = 1, cache_size: int = 1 << 20):
+        """
+        Args:
+            pattern: Regex matching one token
+            normalization: Unicode normalization form, or None to skip it
+            stopwords: Terms dropped from documents and queries
+            stem: Apply light (plural) stemming
+            min_length: Tokens shorter than this are dropped
+            cache_size: Distinct tokens remembered before the cache is reset
+        """
+        self.pattern = pattern
+        self.normalization = normalization
+        self.stopwords: FrozenSet[str] = frozenset(stopwords)
+        self.stem = stem
+        self.min_length = min_length
+        self.cache_size = cache_size
+
+        self._regex = re.compile(pattern)
+        self._cache = _TermCache(self)
+
+    def config(self) -> Dict:
+        """Settings that determine the terms, stored with an index built by this analyzer"""
+        return {
+            'pattern': self.pattern,
+            'normalization': self.normalization,
+            'stopwords': sorted(self.stopwords),
+            'stem': self.stem,
+            'min_length': self.min_length
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'Analyzer':
+        return cls(**config)
+
+    def _term(self, token: str) -> str:
+        if len(token) < self.min_length or token in self.stopwords:
+            return ''
+        return sys.intern(light_stem(token) if self.stem else token)
+
+    def _terms(self, text: str) -> Iterable[str]:
+        """Term of every token of a text, empty for dropped tokens"""
+        if self.normalization and not text.isascii():
+            text = unicodedata.normalize(self.normalization, text)
+        if len(self._cache) > self.cache_size:
+            self._cache.clear()
+        # Lookups run in C; only unseen tokens reach _term
+        return map(self._cache.__getitem__, self._regex.findall(text.casefold()))
+
+    def __call__(self, text: str) -> List[str]:
+        """Index terms of a text, in order"""
+        return list(filter(None, self._terms(text)))
+
+    def with_positions(self, text: str) -> Tuple[List[str], List[int]]:
+        """
+        Index terms of a text with their token positions
+
+        Dropped tokens such as stopwords still take up a position, so terms
+        are only adjacent if their words were adjacent in the text.
+        """
+        terms = list(self._terms(text))
+        positions = [position for position, term in enumerate(terms) if term]
+        return [terms[position] for position in positions], positions
+
+
+# Analyzer used when an index does not say otherwise
+DEFAULT_ANALYZER = Analyzer()
@@ -1,6 +1,6 @@
 import gradio as gr
-from query import create_rag_chain, search_documents
-from ingest import load_documents, split_documents, create_vectorstore
+from query import create_rag_chain, search_documents, get_engine
+from ingest import update_vectorstore
 from config import *
 import os
 from pathlib import Path
@@ -61,12 +61,14 @@ def upload_and_process_pdfs(files):
                 dst.write(src.read())
             uploaded_files.append(filename)
         
-        # Load and process documents
-        documents = load_documents()
-        chunks = split_documents(documents)
-        create_vectorstore(chunks)
+        # Embed only new or modified files
+        summary = update_vectorstore()
+        get_engine().invalidate()
+        # The chain holds a retriever over the old collection handle
+        if rag_chain:
+            initialize_rag()
         
-        return f"✅ Successfully processed {len(uploaded_files)} files:\n" + "\n".join(uploaded_files) + f"\n\n📊 Created {len(chunks)} chunks from {len(documents)} pages"
+        return f"✅ Successfully processed {len(uploaded_files)} files:\n" + "\n".join(uploaded_files) + f"\n\n📊 Created {summary['chunks']} chunks from {summary['pages']} pages ({summary['unchanged']} unchanged files skipped)"
     
     except Exception as e:
         return f"❌ Error processing files: {str(e)}"
@@ -209,6 +211,12 @@ if __name__ == "__main__":
     print("2. Click 'Initialize System' in the 'Query Documents' tab")
     print("3. Start asking questions!")
     
+    # Load the embedding model and open the vector store before the first query
+    try:
+        get_engine().warm_up()
+    except Exception as e:
+        print(f"Retrieval warm-up failed: {e}")
+    
     app.launch(
         share=False,  # Set to True to create a public link
         server_port=7860,
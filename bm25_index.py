@@ -0,0 +1,996 @@
+# bm25_index.py
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+from array import array
+from functools import reduce
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer import Analyzer, DEFAULT_ANALYZER
+
+_PHRASE_PATTERN = re.compile(r'"([^"]+)"(?:~(\d+))?')
+
+
+def parse_query(text: str, analyzer: Analyzer = DEFAULT_ANALYZER) -> Tuple[List[str], List[Tuple[List[str], List[int], int]]]:
+    """
+    Split a query into BM25 terms and phrase constraints
+
+    "exact words" asks for the words next to each other in that order, and
+    "some words"~N for every word within N positions of the first one.
+    Phrase words are scored like any other query term as well. Stopwords
+    inside a phrase keep their place, as they do in the index, so
+    "error code" does not match "error in code".
+
+    Returns:
+        (tokens, [(phrase tokens, offsets, slop)]) where offsets are the
+        positions of the phrase tokens relative to the first one and a slop
+        of 0 means an exact phrase
+    """
+    phrases = []
+    for match in _PHRASE_PATTERN.finditer(text):
+        phrase_tokens, positions = analyzer.with_positions(match.group(1))
+        if phrase_tokens:
+            offsets = [position - positions[0] for position in positions]
+            phrases.append((phrase_tokens, offsets, int(match.group(2)) if match.group(2) else 0))
+    return analyzer(_PHRASE_PATTERN.sub(r' \1 ', text).replace('"', ' ')), phrases
+
+
+def _gather_ranges(ptr: np.ndarray, values: np.ndarray, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate values[ptr[i]:ptr[i + 1]] for each i in idx, returning (values, lengths)"""
+    starts = np.asarray(ptr[idx], dtype=np.int64)
+    lengths = np.asarray(ptr[idx + 1], dtype=np.int64) - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return np.asarray(values[offsets]), lengths
+
+
+def top_k_indices(scores: np.ndarray, k: Optional[int]) -> np.ndarray:
+    """Indices of the k largest scores, best first, using partial selection"""
+    if k is None or k >= len(scores):
+        top = np.arange(len(scores))
+    elif k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    else:
+        top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def merge_top_k(runs: List[Tuple[np.ndarray, np.ndarray]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge (ids, scores) runs that are each sorted best first into the overall top k
+
+    A heap merge only ever looks at the head of each run, so the cost is
+    about k log(runs) no matter how long the runs are. Ties keep run order.
+    """
+    merged = list(islice(
+        heapq.merge(*(zip(scores.tolist(), ids.tolist()) for ids, scores in runs), key=lambda hit: -hit[0]),
+        k
+    ))
+    if not merged:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+    scores, ids = zip(*merged)
+    return np.array(ids, dtype=np.int64), np.array(scores, dtype=np.float64)
+
+
+class BM25Index:
+    """
+    BM25 (Okapi) index stored as flat arrays
+
+    Postings are kept in CSR layout: the postings of term t are
+    doc_idx[indptr[t]:indptr[t + 1]] with matching term frequencies in tf and
+    precomputed BM25 weights in weights, so scoring a query is a gather of a
+    few rows and a sum. impact_order lists each term's postings by descending
+    weight and max_weights holds each term's largest weight; together they let
+    top_k skip documents that cannot make the top k (MaxScore). Indexes built
+    with positions=True also keep every token position, grouped per posting
+    in the same order as doc_idx, for phrase and proximity matching. Positions
+    count every token of the text, including the ones the analyzer drops.
+
+    Text is turned into terms by an Analyzer whose settings are saved with the
+    index, so queries are always analyzed the way the chunks were. Saved
+    indexes are plain .npy files plus JSON for the vocabulary and doc ids, and
+    are memory-mapped on load so opening one costs almost nothing. The idf and
+    average length the weights were computed with are saved alongside them,
+    together with each term's largest weight and the position offsets, so
+    loading never reads the postings. When set_collection_stats asks for
+    other statistics, the postings a query reads are rescored as it reads
+    them and the stored weights stay untouched on disk.
+    Scores match rank_bm25.BM25Okapi over the same terms (to float32
+    precision), including its epsilon floor for negative idf values.
+    """
+
+    FORMAT_VERSION = 7
+    # Postings read in full per requested result to seed the MaxScore threshold
+    SEED_POSTINGS_PER_RESULT = 64
+    _ARRAYS = ('doc_freqs', 'indptr', 'doc_idx', 'tf', 'weights', 'impact_order', 'doc_lengths',
+               'weights_idf', 'weights_max')
+    _POSITION_ARRAYS = ('positions', 'pos_ptr')
+    # Gap between documents in the (doc, position) keys used for phrase matching
+    _POSITION_STRIDE = 1 << 32
+
+    def __init__(self, vocab: Dict[str, int], doc_freqs, indptr, doc_idx, tf, doc_lengths,
+                 doc_ids: List[str], weights=None, impact_order=None, positions=None, pos_ptr=None,
+                 weights_idf=None, weights_avgdl: Optional[float] = None, weights_max=None,
+                 analyzer: Optional[Analyzer] = None, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.vocab = vocab
+        self.doc_freqs = doc_freqs
+        self.indptr = indptr
+        self.doc_idx = doc_idx
+        self.tf = tf
+        self.doc_lengths = doc_lengths
+        self.doc_ids = doc_ids
+        self.analyzer = analyzer or DEFAULT_ANALYZER
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.num_docs = len(doc_ids)
+        # Statistics the stored weights were computed with, passed in along
+        # with weights when loading
+        self.avgdl = weights_avgdl if weights_avgdl is not None else (
+            float(np.mean(doc_lengths)) if self.num_docs else 0.0
+        )
+        self.idf = weights_idf if weights_idf is not None else self._compute_idf()
+        self.length_norm = (
+            self.k1 * (1 - self.b + self.b * np.asarray(doc_lengths) / self.avgdl)
+            if self.num_docs else np.zeros(0)
+        )
+        self.weights = weights if weights is not None else self._compute_weights()
+        self.impact_order = impact_order if impact_order is not None else self._compute_impact_order()
+        self.max_weights = weights_max if weights_max is not None else self._compute_max_weights()
+
+        self.weights_idf = self.idf
+        self.weights_avgdl = self.avgdl
+        self.weights_max = self.max_weights
+        # False once set_collection_stats switches to statistics the stored weights were not computed with
+        self._stored_weights = True
+
+        # Positions of posting i are positions[pos_ptr[i]:pos_ptr[i + 1]], tf of them
+        self.positions = positions
+        self.pos_ptr = pos_ptr
+        if positions is not None and pos_ptr is None:
+            self.pos_ptr = np.zeros(len(tf) + 1, dtype=np.int64)
+            np.cumsum(tf, out=self.pos_ptr[1:])
+
+    def __len__(self):
+        return self.num_docs
+
+    def _compute_idf(self) -> np.ndarray:
+        doc_freqs = np.asarray(self.doc_freqs, dtype=np.float64)
+        idf = np.log(self.num_docs - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+        if len(idf):
+            idf[idf < 0] = self.epsilon * idf.mean()
+        return idf
+
+    def _compute_weights(self) -> np.ndarray:
+        """BM25 contribution of every posting, aligned with doc_idx"""
+        if not len(self.doc_idx):
+            return np.zeros(0, dtype=np.float32)
+        posting_terms = np.repeat(np.arange(len(self.doc_freqs)), np.diff(self.indptr))
+        tf = np.asarray(self.tf, dtype=np.float64)
+        weights = self.idf[posting_terms] * tf * (self.k1 + 1) / (tf + self.length_norm[self.doc_idx])
+        return weights.astype(np.float32)
+
+    def _compute_impact_order(self) -> np.ndarray:
+        """Posting positions sorted by term, then by descending weight"""
+        posting_terms = np.repeat(np.arange(len(self.doc_freqs)), np.diff(self.indptr))
+        return np.lexsort((-np.asarray(self.weights), posting_terms)).astype(np.int64)
+
+    def _compute_max_weights(self) -> np.ndarray:
+        """Upper bound of each term's contribution to any document score"""
+        max_weights = np.zeros(len(self.doc_freqs), dtype=np.float64)
+        nonempty = np.diff(self.indptr) > 0
+        if nonempty.any():
+            max_weights[nonempty] = np.maximum.reduceat(np.asarray(self.weights), self.indptr[:-1][nonempty])
+        return max_weights
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, str]], positions: bool = False,
+              analyzer: Optional[Analyzer] = None, **params) -> 'BM25Index':
+        """
+        Build an index from (doc_id, text) pairs, streaming over them once
+
+        Args:
+            documents: Iterable of (doc_id, text) pairs
+            positions: Also record token positions for phrase and proximity queries
+            analyzer: Analyzer turning text into terms (DEFAULT_ANALYZER if None)
+            **params: k1, b and epsilon overrides
+        """
+        analyzer = analyzer or DEFAULT_ANALYZER
+        vocab: Dict[str, int] = {}
+        doc_ids: List[str] = []
+        doc_lengths = array('i')
+        term_ids = array('i')
+        doc_positions = array('i')
+        counts = array('i')
+        token_positions = array('i')
+
+        for doc_id, text in documents:
+            if positions:
+                tokens, offsets = analyzer.with_positions(text)
+            else:
+                tokens = analyzer(text)
+                offsets = range(len(tokens))
+            occurrences: Dict[int, List[int]] = {}
+            for offset, token in zip(offsets, tokens):
+                term_id = vocab.setdefault(token, len(vocab))
+                occurrences.setdefault(term_id, []).append(offset)
+
+            position = len(doc_ids)
+            doc_ids.append(doc_id)
+            doc_lengths.append(len(tokens))
+            term_ids.extend(occurrences.keys())
+            doc_positions.extend([position] * len(occurrences))
+            counts.extend(len(offsets) for offsets in occurrences.values())
+            if positions:
+                for offsets in occurrences.values():
+                    token_positions.extend(offsets)
+
+        return cls._from_postings(
+            vocab,
+            np.frombuffer(term_ids, dtype=np.int32) if term_ids else np.zeros(0, np.int32),
+            np.frombuffer(doc_positions, dtype=np.int32) if doc_positions else np.zeros(0, np.int32),
+            np.frombuffer(counts, dtype=np.int32) if counts else np.zeros(0, np.int32),
+            np.asarray(doc_lengths, dtype=np.int32),
+            doc_ids,
+            positions=(np.frombuffer(token_positions, dtype=np.int32) if token_positions else np.zeros(0, np.int32))
+            if positions else None,
+            analyzer=analyzer,
+            **params
+        )
+
+    @classmethod
+    def _from_postings(cls, vocab, term_ids, doc_positions, counts, doc_lengths, doc_ids,
+                       positions=None, **params) -> 'BM25Index':
+        """
+        Build an index from unordered (term, doc, tf) posting triples listed in doc order
+
+        positions, if given, holds the token positions of each posting in the
+        same order, tf of them per posting.
+        """
+        # Group postings by term; the stable sort keeps doc order within a term
+        order = np.argsort(term_ids, kind='stable')
+        doc_freqs = np.bincount(term_ids, minlength=len(vocab)).astype(np.int32)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freqs, out=indptr[1:])
+
+        if positions is not None:
+            pos_ptr = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=pos_ptr[1:])
+            positions, _ = _gather_ranges(pos_ptr, positions, order)
+
+        return cls(
+            vocab,
+            doc_freqs,
+            indptr,
+            doc_positions[order],
+            counts[order],
+            doc_lengths,
+            doc_ids,
+            positions=positions,
+            **params
+        )
+
+    @classmethod
+    def merge(cls, segments: List['BM25Index'], live_masks: List[Optional[np.ndarray]], **params) -> 'BM25Index':
+        """
+        Combine segments into one, dropping the documents masked out as deleted
+
+        Positions are kept if every segment has them. All segments must have
+        been built with the same analyzer.
+
+        Args:
+            segments: Indexes to merge, in document order
+            live_masks: Per segment boolean mask of documents to keep, or None to keep all
+            **params: k1, b and epsilon for the merged index
+        """
+        vocab: Dict[str, int] = {}
+        doc_ids: List[str] = []
+        term_ids, doc_positions, counts, doc_lengths = [], [], [], []
+        with_positions = all(segment.positions is not None for segment in segments)
+        token_positions = []
+
+        for segment, live in zip(segments, live_masks):
+            if live is None:
+                live = np.ones(segment.num_docs, dtype=bool)
+            posting_terms = np.repeat(np.arange(len(segment.doc_freqs)), np.diff(segment.indptr))
+            segment_docs = np.asarray(segment.doc_idx)
+            keep = live[segment_docs]
+
+            # Map surviving terms and doc positions into the merged index. Terms
+            # left without postings are dropped, so they neither grow the
+            # vocabulary nor skew the mean idf behind the epsilon floor
+            terms = segment.terms()
+            term_map = np.full(len(terms), -1, dtype=np.int32)
+            for term_id in np.flatnonzero(np.bincount(posting_terms[keep], minlength=len(terms))):
+                term_map[term_id] = vocab.setdefault(terms[term_id], len(vocab))
+            doc_map = np.cumsum(live, dtype=np.int64) - 1 + len(doc_ids)
+            # Re-sort by document so the merged postings stay in doc order
+            order = np.argsort(segment_docs[keep], kind='stable')
+            term_ids.append(term_map[posting_terms[keep]][order])
+            doc_positions.append(doc_map[segment_docs[keep]][order].astype(np.int32))
+            counts.append(np.asarray(segment.tf)[keep][order])
+            if with_positions:
+                token_positions.append(_gather_ranges(segment.pos_ptr, segment.positions, np.flatnonzero(keep)[order])[0])
+            doc_lengths.append(np.asarray(segment.doc_lengths)[live])
+            doc_ids.extend(doc_id for doc_id, alive in zip(segment.doc_ids, live) if alive)
+
+        def concat(arrays, dtype):
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype)
+
+        return cls._from_postings(
+            vocab,
+            concat(term_ids, np.int32),
+            concat(doc_positions, np.int32),
+            concat(counts, np.int32),
+            concat(doc_lengths, np.int32),
+            doc_ids,
+            positions=concat(token_positions, np.int32) if with_positions else None,
+            analyzer=segments[0].analyzer if segments else None,
+            **params
+        )
+
+    @classmethod
+    def from_documents(cls, documents, **params) -> 'BM25Index':
+        """Build an index from langchain Documents, keyed by metadata['doc_id'] when present"""
+        return cls.build(
+            ((doc.metadata.get('doc_id', str(i)), doc.page_content) for i, doc in enumerate(documents)),
+            **params
+        )
+
+    def terms(self) -> List[str]:
+        """Vocabulary as a list indexed by term id"""
+        terms = [None] * len(self.vocab)
+        for term, term_id in self.vocab.items():
+            terms[term_id] = term
+        return terms
+
+    def set_collection_stats(self, idf: np.ndarray, avgdl: float):
+        """
+        Score with idf and average length taken from a larger collection
+
+        Used by IncrementalBM25Index so that every segment scores against the
+        statistics of the whole index rather than its own. Nothing is
+        rescored up front: unless these are the statistics the stored weights
+        were computed with, each query computes the weights of just the
+        postings it reads.
+        """
+        self.idf = idf
+        self.avgdl = avgdl
+        # float32 like the stored weights, which makes rescoring postings cheaper
+        self.length_norm = (self.k1 * (1 - self.b + self.b * np.asarray(self.doc_lengths) / avgdl)).astype(np.float32)
+        self._stored_weights = avgdl == self.weights_avgdl and np.array_equal(idf, self.weights_idf)
+        if self._stored_weights:
+            self.max_weights = self.weights_max
+            return
+
+        # Bound the new weights from the stored maxima without reading any
+        # postings. The tf part tf * (k1 + 1) / (tf + length_norm) of a
+        # posting is below k1 + 1, and grows by at most avgdl / weights_avgdl
+        # when the average length grows (it can only shrink otherwise). The
+        # small margin covers the float32 rounding of the stored weights.
+        stored_idf = np.asarray(self.weights_idf)
+        positive = stored_idf > 0
+        tf_part = np.full(len(stored_idf), self.k1 + 1)
+        tf_part[positive] = np.asarray(self.weights_max)[positive] / stored_idf[positive]
+        growth = max(1.0, avgdl / self.weights_avgdl) if self.weights_avgdl else 1.0
+        self.max_weights = idf * np.minimum(tf_part * growth, self.k1 + 1) * (1 + 1e-6)
+        # impact_order is kept: it only picks which postings seed the MaxScore
+        # threshold, so a slightly stale order costs speed, never correctness
+
+    def _posting_weights(self, term_id: int, postings) -> np.ndarray:
+        """Weights of one term's postings at the given slice or indices under the current statistics"""
+        if self._stored_weights:
+            return np.asarray(self.weights[postings])
+        tf = np.asarray(self.tf[postings], dtype=np.float32)
+        weights = tf * np.float32(self.idf[term_id] * (self.k1 + 1))
+        weights /= tf + self.length_norm[self.doc_idx[postings]]
+        return weights
+
+    def _gather(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Concatenated postings (doc positions, weights) of the query terms"""
+        rows = [
+            (term_id, slice(self.indptr[term_id], self.indptr[term_id + 1]))
+            for term_id in (self.vocab.get(token) for token in tokens)
+            if term_id is not None
+        ]
+        if not rows:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        docs = np.concatenate([self.doc_idx[postings] for _, postings in rows])
+        weights = np.concatenate([self._posting_weights(term_id, postings) for term_id, postings in rows])
+        return docs, weights
+
+    def get_scores(self, tokens: List[str]) -> np.ndarray:
+        """BM25 score of every document for the query tokens"""
+        docs, weights = self._gather(tokens)
+        return np.bincount(docs, weights=weights, minlength=self.num_docs)
+
+    def phrase_matches(self, phrase_tokens: List[str], slop: int = 0,
+                       offsets: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Documents containing a phrase, found from the stored positions
+
+        Only documents holding every phrase word are examined. With slop 0
+        word i must occur offsets[i] positions after the first word (by
+        default right after the previous word); otherwise every word must
+        occur within slop positions of an occurrence of the first word.
+
+        Returns:
+            Sorted doc positions (empty if the index has no positions)
+        """
+        term_ids = [self.vocab.get(token) for token in phrase_tokens]
+        if self.positions is None or not term_ids or any(term_id is None for term_id in term_ids):
+            return np.zeros(0, dtype=np.int64)
+
+        postings = [np.asarray(self.doc_idx[self.indptr[t]:self.indptr[t + 1]]) for t in term_ids]
+        docs = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), postings).astype(np.int64)
+        if len(term_ids) == 1 or not len(docs):
+            return docs
+
+        def keys(i):
+            # (doc, position) pairs of phrase word i in the candidate docs, as sorted int64 keys
+            posting_idx = self.indptr[term_ids[i]] + np.searchsorted(postings[i], docs)
+            offsets, lengths = _gather_ranges(self.pos_ptr, self.positions, posting_idx)
+            return np.repeat(docs, lengths) * self._POSITION_STRIDE + offsets
+
+        if offsets is None:
+            offsets = range(len(term_ids))
+        anchors = keys(0)
+        matched = np.ones(len(anchors), dtype=bool)
+        for i in range(1, len(term_ids)):
+            other = keys(i)
+            low, high = (offsets[i], offsets[i]) if slop == 0 else (-slop, slop)
+            found = np.searchsorted(other, anchors + low)
+            in_range = found < len(other)
+            in_range[in_range] = other[found[in_range]] <= anchors[in_range] + high
+            matched &= in_range
+        return np.unique(anchors[matched] // self._POSITION_STRIDE)
+
+    def top_k(self, tokens: List[str], k: int, live: Optional[np.ndarray] = None,
+              pruned: bool = False, phrases: Optional[List[Tuple[List[str], List[int], int]]] = None,
+              phrase_filter: bool = False, phrase_boost: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best k documents for the query tokens
+
+        Only documents that contain a query term are scored, so the cost
+        depends on the postings touched rather than on the corpus size.
+
+        Args:
+            tokens: Query tokens
+            k: Number of documents to return
+            live: Optional boolean mask of documents that may be returned
+            pruned: Use MaxScore pruning (same results, fewer postings read)
+            phrases: (phrase tokens, offsets, slop) constraints from parse_query; ignored
+                when the index was built without positions
+            phrase_filter: Only return documents matching every phrase
+            phrase_boost: Otherwise multiply the score of a document by
+                1 + phrase_boost for each phrase it matches
+
+        Returns:
+            (doc positions, scores), best first
+        """
+        boosted = []
+        if phrases and self.positions is not None:
+            matched = [
+                self.phrase_matches(phrase_tokens, slop, offsets)
+                for phrase_tokens, offsets, slop in phrases
+            ]
+            if phrase_filter:
+                mask = np.zeros(self.num_docs, dtype=bool)
+                mask[reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), matched)] = True
+                live = mask if live is None else live & mask
+            else:
+                boosted = matched
+
+        if pruned and not boosted:
+            return self.top_k_maxscore(tokens, k, live=live)
+
+        docs, weights = self._gather(tokens)
+        if not len(docs) or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        for matched_docs in boosted:
+            scores[np.isin(candidates, matched_docs, assume_unique=True)] *= 1 + phrase_boost
+        if live is not None:
+            keep = live[candidates]
+            candidates, scores = candidates[keep], scores[keep]
+            if not len(candidates):
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        top = top_k_indices(scores, k)
+        return candidates[top].astype(np.int64), scores[top]
+
+    def _query_terms(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct known term ids of the query with how often each occurs"""
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            term_id = self.vocab.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        return (
+            np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)),
+            np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        )
+
+    def _lookup(self, term_id, docs: np.ndarray) -> np.ndarray:
+        """Weight of one term in each of the sorted docs (0 where absent), by binary search"""
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        postings = self.doc_idx[start:end]
+        found = np.zeros(len(docs), dtype=np.float64)
+        if end == start or not len(docs):
+            return found
+        positions = np.searchsorted(postings, docs)
+        hit = positions < len(postings)
+        hit[hit] = postings[positions[hit]] == docs[hit]
+        found[hit] = self._posting_weights(term_id, start + positions[hit])
+        return found
+
+    def top_k_maxscore(self, tokens: List[str], k: int, live: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best k documents for the query tokens using MaxScore dynamic pruning
+
+        The highest-impact postings of each term are scored first to get a
+        threshold: the k-th best score among them. Terms are then split by
+        their upper bounds: if the bounds of the weakest terms add up to less
+        than the threshold, a document matching only those terms cannot make
+        the top k, so only the postings of the remaining (essential) terms are
+        read. The candidates are then completed by binary search in the
+        non-essential postings, dropping those whose partial score plus the
+        bounds of the terms left can no longer reach the threshold. Results
+        are identical to exhaustive scoring.
+
+        Args:
+            tokens: Query tokens
+            k: Number of documents to return
+            live: Optional boolean mask of documents that may be returned
+
+        Returns:
+            (doc positions, scores), best first
+        """
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        term_ids, counts = self._query_terms(tokens)
+        if not len(term_ids) or k <= 0:
+            return empty
+        upper_bounds = self.max_weights[term_ids] * counts
+        if (upper_bounds <= 0).any():
+            # Bounds only prune when every term adds a positive amount
+            return self.top_k(tokens, k, live=live)
+
+        # Threshold from a cheap sample of likely winners: the top k postings
+        # (by impact) of each term, plus every posting of the strongest terms
+        # while they are short
+        sample = [
+            self.doc_idx[self.impact_order[self.indptr[t]:min(self.indptr[t] + k, self.indptr[t + 1])]]
+            for t in term_ids
+        ]
+        budget = self.SEED_POSTINGS_PER_RESULT * k
+        for i in np.argsort(-upper_bounds, kind='stable'):
+            start, end = self.indptr[term_ids[i]], self.indptr[term_ids[i] + 1]
+            if end - start > budget:
+                break
+            sample.append(self.doc_idx[start:end])
+            budget -= end - start
+        seeds = np.unique(np.concatenate(sample))
+        if live is not None:
+            seeds = seeds[live[seeds]]
+        threshold = 0.0
+        if len(seeds) >= k:
+            seed_scores = sum(self._lookup(t, seeds) * c for t, c in zip(term_ids, counts))
+            threshold = np.partition(seed_scores, len(seeds) - k)[len(seeds) - k]
+
+        # Non-essential terms: the longest run of weakest terms whose bounds sum below the threshold
+        order = np.argsort(upper_bounds, kind='stable')
+        cumulative = np.cumsum(upper_bounds[order])
+        num_non_essential = int(np.searchsorted(cumulative, threshold, side='left'))
+        essential = order[num_non_essential:]
+
+        docs = np.concatenate([self.doc_idx[self.indptr[term_ids[i]]:self.indptr[term_ids[i] + 1]] for i in essential])
+        weights = np.concatenate([
+            self._posting_weights(term_ids[i], slice(self.indptr[term_ids[i]], self.indptr[term_ids[i] + 1])) * counts[i]
+            for i in essential
+        ])
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse.ravel(), weights=weights)
+        if live is not None:
+            candidates, scores = candidates[live[candidates]], scores[live[candidates]]
+
+        # Probe the non-essential terms strongest first. Partial scores are
+        # lower bounds, so their k-th best can only raise the threshold;
+        # candidates that cannot reach it with the bounds of the terms still
+        # to come are dropped before each probe.
+        remaining_bound = cumulative[num_non_essential - 1] if num_non_essential else 0.0
+        for i in order[:num_non_essential][::-1]:
+            if len(scores) > k:
+                threshold = max(threshold, np.partition(scores, len(scores) - k)[len(scores) - k])
+            keep = scores + remaining_bound >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+            scores += self._lookup(term_ids[i], candidates) * counts[i]
+            remaining_bound -= upper_bounds[i]
+
+        top = top_k_indices(scores, k)
+        return candidates[top].astype(np.int64), scores[top]
+
+    def save(self, index_dir="cache/bm25"):
+        """Write the index to a directory, swapping it in only once it is fully written"""
+        index_dir = Path(index_dir)
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        for name in self._ARRAYS:
+            np.save(tmp_dir / f"{name}.npy", np.asarray(getattr(self, name)))
+        if self.positions is not None:
+            for name in self._POSITION_ARRAYS:
+                np.save(tmp_dir / f"{name}.npy", np.asarray(getattr(self, name)))
+
+        with open(tmp_dir / "vocab.json", 'w', encoding='utf-8') as f:
+            json.dump(self.terms(), f)
+        with open(tmp_dir / "doc_ids.json", 'w', encoding='utf-8') as f:
+            json.dump(self.doc_ids, f)
+        with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.FORMAT_VERSION,
+                'k1': self.k1,
+                'b': self.b,
+                'epsilon': self.epsilon,
+                'weights_avgdl': self.weights_avgdl,
+                'analyzer': self.analyzer.config()
+            }, f)
+
+        if index_dir.exists():
+            old_dir = index_dir.with_name(index_dir.name + ".old")
+            if old_dir.exists():
+                shutil.rmtree(old_dir)
+            os.replace(index_dir, old_dir)
+            os.replace(tmp_dir, index_dir)
+            shutil.rmtree(old_dir)
+        else:
+            os.replace(tmp_dir, index_dir)
+
+    @staticmethod
+    def _load_array(path, mmap):
+        try:
+            return np.load(path, mmap_mode='r' if mmap else None)
+        except ValueError:
+            # Empty arrays cannot be memory-mapped
+            return np.load(path)
+
+    @classmethod
+    def load(cls, index_dir="cache/bm25", mmap: bool = True) -> Optional['BM25Index']:
+        """Open a saved index (memory-mapped by default), or return None if there is none"""
+        index_dir = Path(index_dir)
+        if not (index_dir / "meta.json").exists():
+            return None
+
+        with open(index_dir / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != cls.FORMAT_VERSION:
+            return None
+
+        with open(index_dir / "vocab.json", 'r', encoding='utf-8') as f:
+            vocab = {term: term_id for term_id, term in enumerate(json.load(f))}
+        with open(index_dir / "doc_ids.json", 'r', encoding='utf-8') as f:
+            doc_ids = json.load(f)
+
+        arrays = {name: cls._load_array(index_dir / f"{name}.npy", mmap) for name in cls._ARRAYS}
+        if (index_dir / "positions.npy").exists():
+            arrays.update(
+                (name, cls._load_array(index_dir / f"{name}.npy", mmap)) for name in cls._POSITION_ARRAYS
+            )
+        return cls(
+            vocab,
+            doc_ids=doc_ids,
+            weights_avgdl=meta['weights_avgdl'],
+            analyzer=Analyzer.from_config(meta['analyzer']),
+            k1=meta['k1'],
+            b=meta['b'],
+            epsilon=meta['epsilon'],
+            **arrays
+        )
+
+
+class IncrementalBM25Index:
+    """
+    Updatable BM25 index made of immutable BM25Index segments
+
+    New chunks are buffered and written as a fresh segment on flush; deleted
+    chunks are only tombstoned, and disappear from disk when their segment is
+    merged. Merges happen once there are more than max_segments segments, or
+    when a segment is mostly tombstones. Adding an id that already exists
+    replaces it, matching Chroma's upsert.
+
+    Every segment is scored with collection-wide idf and average length,
+    recomputed lazily on the first query after a change. Like Lucene's, these
+    statistics count tombstoned chunks until their segment is merged: document
+    count, frequencies and lengths all cover the same population, so idf
+    stays well defined however many chunks were deleted.
+
+    Layout on disk: segments.json lists the live segments and tombstones,
+    and each segment is a BM25Index directory next to it.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, index_dir="cache/bm25", max_segments=8, max_deleted_ratio=0.3, positions: bool = False,
+                 analyzer: Optional[Analyzer] = None, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.index_dir = Path(index_dir)
+        self.positions = positions
+        self.analyzer = analyzer or DEFAULT_ANALYZER
+        self.max_segments = max_segments
+        self.max_deleted_ratio = max_deleted_ratio
+        self.params = {'k1': k1, 'b': b, 'epsilon': epsilon}
+
+        self.segments: List[Tuple[str, BM25Index]] = []
+        self.tombstones: Dict[str, np.ndarray] = {}
+        self.next_segment = 0
+        self._pending: Dict[str, str] = {}
+        self._locations: Dict[str, Tuple[str, int]] = {}
+        self._unsaved = set()
+        self._stale = True
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        live = sum(
+            segment.num_docs - int(self.tombstones[name].sum()) if name in self.tombstones else segment.num_docs
+            for name, segment in self.segments
+        )
+        return live + len(self._pending)
+
+    @classmethod
+    def load(cls, index_dir="cache/bm25", mmap: bool = True, **options) -> Optional['IncrementalBM25Index']:
+        """Open a saved index (segments memory-mapped by default), or return None if there is none"""
+        index = cls(index_dir, **options)
+        manifest_path = index.index_dir / "segments.json"
+        if not manifest_path.exists():
+            return None
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != cls.FORMAT_VERSION:
+            return None
+
+        index.params = manifest['params']
+        index.positions = manifest.get('positions', False)
+        index.analyzer = Analyzer.from_config(manifest['analyzer'])
+        index.next_segment = manifest['next_segment']
+        for name in manifest['segments']:
+            segment = BM25Index.load(index.index_dir / name, mmap=mmap)
+            if segment is None:
+                return None
+            index.segments.append((name, segment))
+        for name, positions in manifest['tombstones'].items():
+            mask = np.zeros(index._segment(name).num_docs, dtype=bool)
+            mask[positions] = True
+            index.tombstones[name] = mask
+        index._index_locations()
+        return index
+
+    def _segment(self, name) -> BM25Index:
+        return dict(self.segments)[name]
+
+    def _index_locations(self):
+        """Map every live doc_id to its (segment, position)"""
+        self._locations = {}
+        for name, segment in self.segments:
+            deleted = self.tombstones.get(name)
+            for position, doc_id in enumerate(segment.doc_ids):
+                if deleted is None or not deleted[position]:
+                    self._locations[doc_id] = (name, position)
+        self._stale = True
+
+    def add(self, documents: Iterable[Tuple[str, str]]):
+        """Add or replace (doc_id, text) pairs; they become searchable after the next flush"""
+        with self._lock:
+            for doc_id, text in documents:
+                self._tombstone(doc_id)
+                self._pending[doc_id] = text
+
+    def add_documents(self, documents):
+        """Add or replace langchain Documents keyed by metadata['doc_id']"""
+        self.add((doc.metadata['doc_id'], doc.page_content) for doc in documents)
+
+    def delete(self, doc_ids: Iterable[str]):
+        """Remove chunks by id; unknown ids are ignored"""
+        with self._lock:
+            for doc_id in doc_ids:
+                self._pending.pop(doc_id, None)
+                self._tombstone(doc_id)
+
+    def _tombstone(self, doc_id):
+        location = self._locations.pop(doc_id, None)
+        if location is None:
+            return
+        name, position = location
+        if name not in self.tombstones:
+            self.tombstones[name] = np.zeros(self._segment(name).num_docs, dtype=bool)
+        self.tombstones[name][position] = True
+        self._stale = True
+
+    def clear(self):
+        """Drop every segment; the directory is cleaned up on the next save"""
+        with self._lock:
+            self.segments = []
+            self.tombstones = {}
+            self._pending = {}
+            self._locations = {}
+            self._unsaved = set()
+            self._stale = True
+
+    def rebuild(self, documents: Iterable[Tuple[str, str]]):
+        """Replace the whole index with a single segment built from (doc_id, text) pairs, streaming over them"""
+        with self._lock:
+            self.clear()
+            segment = BM25Index.build(documents, positions=self.positions, analyzer=self.analyzer, **self.params)
+            name = self._new_segment_name()
+            self.segments.append((name, segment))
+            self._unsaved.add(name)
+            self._index_locations()
+
+    def flush(self):
+        """Turn pending documents into a new segment and merge segments if the policy asks for it"""
+        with self._lock:
+            if self._pending:
+                segment = BM25Index.build(self._pending.items(), positions=self.positions, analyzer=self.analyzer, **self.params)
+                name = self._new_segment_name()
+                self._pending = {}
+                self.segments.append((name, segment))
+                for position, doc_id in enumerate(segment.doc_ids):
+                    self._locations[doc_id] = (name, position)
+                self._unsaved.add(name)
+                self._stale = True
+            self._maybe_merge()
+
+    def _new_segment_name(self):
+        name = f"seg_{self.next_segment:06d}"
+        self.next_segment += 1
+        return name
+
+    def _deleted_ratio(self, name, segment):
+        mask = self.tombstones.get(name)
+        return float(mask.mean()) if mask is not None and segment.num_docs else 0.0
+
+    def _maybe_merge(self):
+        # Merge the smallest segments together once there are too many, plus
+        # any segment that is mostly tombstones
+        by_size = sorted(self.segments, key=lambda item: item[1].num_docs)
+        excess = len(self.segments) - self.max_segments
+        selected = {name for name, _ in by_size[:excess + 1]} if excess > 0 else set()
+        selected.update(
+            name for name, segment in self.segments
+            if self._deleted_ratio(name, segment) > self.max_deleted_ratio
+        )
+        if selected:
+            self.merge([name for name, _ in self.segments if name in selected])
+
+    def merge(self, names=None):
+        """Merge the named segments (all by default) into one, purging their tombstones"""
+        with self._lock:
+            names = [name for name, _ in self.segments] if names is None else list(names)
+            if not names:
+                return
+            chosen = [(name, segment) for name, segment in self.segments if name in names]
+            merged = BM25Index.merge(
+                [segment for _, segment in chosen],
+                [~self.tombstones[name] if name in self.tombstones else None for name, _ in chosen],
+                **self.params
+            )
+
+            # The merged segment takes the place of the first one it replaces
+            position = [name for name, _ in self.segments].index(chosen[0][0])
+            remaining = [(name, segment) for name, segment in self.segments if name not in names]
+            for name in names:
+                self.tombstones.pop(name, None)
+                self._unsaved.discard(name)
+
+            merged_name = self._new_segment_name()
+            if merged.num_docs:
+                remaining.insert(position, (merged_name, merged))
+                self._unsaved.add(merged_name)
+            self.segments = remaining
+            self._index_locations()
+
+    def _refresh(self):
+        """Recompute collection-wide statistics and hand them to every segment"""
+        vocab: Dict[str, int] = {}
+        term_maps = []
+        for _, segment in self.segments:
+            term_maps.append(np.array(
+                [vocab.setdefault(term, len(vocab)) for term in segment.terms()],
+                dtype=np.int64
+            ))
+
+        # doc_freqs include tombstoned chunks, so the document count and
+        # lengths must too; a live-only count can fall below a term's doc
+        # frequency and turn its idf into NaN
+        doc_freqs = np.zeros(len(vocab), dtype=np.float64)
+        num_docs = 0
+        total_length = 0
+        for (_, segment), term_map in zip(self.segments, term_maps):
+            np.add.at(doc_freqs, term_map, np.asarray(segment.doc_freqs))
+            num_docs += segment.num_docs
+            total_length += int(np.asarray(segment.doc_lengths).sum())
+
+        if num_docs:
+            idf = np.log(num_docs - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+            if len(idf):
+                idf[idf < 0] = self.params['epsilon'] * idf.mean()
+            avgdl = total_length / num_docs
+            for (_, segment), term_map in zip(self.segments, term_maps):
+                segment.set_collection_stats(idf[term_map], avgdl)
+
+        offsets = np.cumsum([0] + [segment.num_docs for _, segment in self.segments])
+        self._offsets = offsets[:-1]
+        self.doc_ids = [doc_id for _, segment in self.segments for doc_id in segment.doc_ids]
+        self._stale = False
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._pending:
+                self.flush()
+            if self._stale:
+                self._refresh()
+
+    def top_k(self, tokens: List[str], k: int, pruned: bool = False, **phrase_options) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best k live documents for the query tokens
+
+        Args:
+            tokens: Query tokens
+            k: Number of documents to return
+            pruned: Use MaxScore pruning
+            **phrase_options: phrases, phrase_filter and phrase_boost as for BM25Index.top_k
+
+        Returns:
+            (positions into doc_ids, scores), best first
+        """
+        self._ensure_fresh()
+        runs = []
+        for (name, segment), offset in zip(self.segments, self._offsets):
+            live = ~self.tombstones[name] if name in self.tombstones else None
+            segment_positions, segment_scores = segment.top_k(tokens, k, live=live, pruned=pruned, **phrase_options)
+            runs.append((segment_positions + offset, segment_scores))
+        return merge_top_k(runs, k)
+
+    def save(self):
+        """Flush, write new segments and atomically publish the segment list"""
+        with self._lock:
+            self.flush()
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            for i, (name, segment) in enumerate(self.segments):
+                if name in self._unsaved:
+                    segment.save(self.index_dir / name)
+                    # Serve the segment memory-mapped from now on instead of holding it in RAM
+                    self.segments[i] = (name, BM25Index.load(self.index_dir / name))
+            self._unsaved = set()
+
+            manifest_path = self.index_dir / "segments.json"
+            tmp_path = manifest_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': self.FORMAT_VERSION,
+                    'params': self.params,
+                    'positions': self.positions,
+                    'analyzer': self.analyzer.config(),
+                    'next_segment': self.next_segment,
+                    'segments': [name for name, _ in self.segments],
+                    'tombstones': {
+                        name: np.flatnonzero(mask).tolist() for name, mask in self.tombstones.items()
+                    }
+                }, f)
+            os.replace(tmp_path, manifest_path)
+
+            # Remove merged-away segments and anything else no longer referenced
+            live_names = {name for name, _ in self.segments}
+            for path in self.index_dir.iterdir():
+                if path.is_dir() and path.name not in live_names:
+                    shutil.rmtree(path, ignore_errors=True)
+                elif path.is_file() and path.name != "segments.json":
+                    path.unlink()
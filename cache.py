@@ -1,38 +1,117 @@
 # cache.py
 import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import pickle
+import re
+import sqlite3
 from pathlib import Path  # This is what Path refers to
+from typing import List
+
+import numpy as np
 
 class QueryCache:
-    def __init__(self, cache_dir="cache", ttl_hours=24):
+    """
+    Two-tier cache of search results: an in-process LRU in front of pickle files on disk
+    
+    The memory tier is bounded by both entry count and pickled size. set()
+    writes through to both tiers; a disk hit is promoted into memory, so
+    repeated questions are answered without reading the disk. Entries are
+    kept pickled and unpickled on every hit, so callers never share (and
+    mutate) a cached object. clear() replaces a generation marker file, and
+    every process drops its memory tier once it sees the marker change.
+    """
+    
+    def __init__(self, cache_dir="cache", ttl_hours=24, memory_entries=256, memory_bytes=64 * 1024 * 1024):
         self.cache_dir = Path(cache_dir)  # Creates a Path object
         self.cache_dir.mkdir(exist_ok=True)  # Creates directory if it doesn't exist
         self.ttl = timedelta(hours=ttl_hours)
+        self.memory_entries = memory_entries
+        self.memory_bytes = memory_bytes
+        
+        # cache_key -> (timestamp, pickled entry), least recently used first
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._generation_file = self.cache_dir / "query_cache.generation"
+        self._memory_generation = self._generation()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
         
     def _get_cache_key(self, query, k=5):
         """Generate cache key from query"""
         key_str = f"{query}_{k}"
         return hashlib.md5(key_str.encode()).hexdigest()
     
+    def _generation(self):
+        """Identity of the current generation marker; clear() replaces the file, changing it"""
+        try:
+            stat = os.stat(self._generation_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def _remember(self, cache_key, timestamp, data):
+        """Put a pickled entry in the memory tier, evicting least recently used ones to fit"""
+        if len(data) > self.memory_bytes or self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._forget(cache_key)
+            self._memory[cache_key] = (timestamp, data)
+            self._memory_size += len(data)
+            while len(self._memory) > self.memory_entries or self._memory_size > self.memory_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+    
+    def _forget(self, cache_key):
+        entry = self._memory.pop(cache_key, None)
+        if entry is not None:
+            self._memory_size -= len(entry[1])
+    
+    def _clear_memory(self):
+        self._memory.clear()
+        self._memory_size = 0
+    
     def get(self, query, k=5):
         """Get cached result if exists and not expired"""
         cache_key = self._get_cache_key(query, k)
+        generation = self._generation()
+        
+        with self._lock:
+            # Another process (e.g. python ingest.py) cleared the cache
+            if generation != self._memory_generation:
+                self._clear_memory()
+                self._memory_generation = generation
+            entry = self._memory.get(cache_key)
+            if entry is not None:
+                if datetime.now() - entry[0] < self.ttl:
+                    self._memory.move_to_end(cache_key)
+                    self.memory_hits += 1
+                    return pickle.loads(entry[1])['result']
+                self._forget(cache_key)
+        
         cache_file = self.cache_dir / f"{cache_key}.pkl"  # Path concatenation
         
         if cache_file.exists():  # Check if file exists
             with open(cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
+                data = f.read()
+            cached_data = pickle.loads(data)
             
             # Check if expired
             if datetime.now() - cached_data['timestamp'] < self.ttl:
+                self._remember(cache_key, cached_data['timestamp'], data)
+                self.disk_hits += 1
                 return cached_data['result']
         
+        self.misses += 1
         return None
     
     def set(self, query, result, k=5):
-        """Cache the result"""
+        """Cache the result in memory and on disk"""
         cache_key = self._get_cache_key(query, k)
         cache_file = self.cache_dir / f"{cache_key}.pkl"
         
@@ -42,12 +121,37 @@ class QueryCache:
             'timestamp': datetime.now(),
             'k': k
         }
+        data = pickle.dumps(cached_data)
         
         with open(cache_file, 'wb') as f:
-            pickle.dump(cached_data, f)
+            f.write(data)
+        self._remember(cache_key, cached_data['timestamp'], data)
+    
+    def clear(self):
+        """Drop every cached result from memory and disk (call when the indexed documents change)"""
+        with self._lock:
+            self._clear_memory()
+        
+        # Only result files, named by their md5 key; cache/ holds other data too
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            if re.fullmatch(r"[0-9a-f]{32}", cache_file.stem):
+                cache_file.unlink(missing_ok=True)
+        
+        # Replacing the marker gives it a new inode and mtime, which tells
+        # other processes to drop their memory tiers as well
+        tmp_file = self._generation_file.with_suffix('.tmp')
+        tmp_file.write_text(datetime.now().isoformat())
+        os.replace(tmp_file, self._generation_file)
+        with self._lock:
+            self._memory_generation = self._generation()
     
     def clear_expired(self):
-        """Remove expired cache files"""
+        """Remove expired cache files and memory entries"""
+        with self._lock:
+            expired = [key for key, entry in self._memory.items() if datetime.now() - entry[0] >= self.ttl]
+            for cache_key in expired:
+                self._forget(cache_key)
+        
         for cache_file in self.cache_dir.glob("*.pkl"):
             try:
                 with open(cache_file, 'rb') as f:
@@ -57,4 +161,125 @@ class QueryCache:
                     cache_file.unlink()  # Delete the file
             except:
                 # If we can't read it, delete it
-                cache_file.unlink()
\ No newline at end of file
+                cache_file.unlink()
+
+
+class EmbeddingCache:
+    """On-disk store of embedding vectors keyed by model name + chunk text hash"""
+    
+    def __init__(self, cache_path="cache/embeddings.sqlite"):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Ingestion embeds on a pipeline thread, not the thread that built the cache
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(model_name, text):
+        """Hash the model name and whitespace-normalized text"""
+        normalized = re.sub(r'\s+', ' ', text).strip()
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys, batch_size=500):
+        """Return a dict of key -> vector for the keys present in the cache"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), batch_size):
+            batch = unique_keys[start:start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+    
+    def set_many(self, items):
+        """Store (key, vector) pairs"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        )
+        self.conn.commit()
+
+
+class OCRCache:
+    """On-disk store of OCR text keyed by a digest of the decoded image pixels"""
+    
+    def __init__(self, cache_path="cache/ocr.sqlite"):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr (key TEXT PRIMARY KEY, text TEXT NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(samples, width, height, channels, lang, config):
+        """Hash the raw pixel samples together with the geometry and tesseract settings"""
+        digest = hashlib.sha256(samples)
+        digest.update(f"\0{width}x{height}x{channels}\0{lang}\0{config}".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Return the cached text (possibly empty) or None"""
+        row = self.conn.execute("SELECT text FROM ocr WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+    
+    def set(self, key, text):
+        self.conn.execute("INSERT OR REPLACE INTO ocr (key, text) VALUES (?, ?)", (key, text))
+        self.conn.commit()
+
+
+class CachedEmbeddings:
+    """
+    Embeddings wrapper that consults an EmbeddingCache before calling the model
+    
+    Only document embeddings are cached; queries go straight to the model.
+    """
+    
+    def __init__(self, embeddings, model_name, cache=None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+    
+    @property
+    def hits(self):
+        return self.cache.hits
+    
+    @property
+    def misses(self):
+        return self.cache.misses
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
+        
+        # Embed each distinct missing text once, even if it repeats in the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self.cache.set_many(new_items)
+            found.update(new_items)
+        
+        self.cache.misses += len(missing)
+        self.cache.hits += len(texts) - len(missing)
+        return [list(found[key]) for key in keys]
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
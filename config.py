@@ -19,6 +19,35 @@ USE_OPENAI_EMBEDDINGS = os.getenv("USE_OPENAI_EMBEDDINGS", "false").lower() == "
 EMBEDDING_MODEL = "text-embedding-ada-002" if USE_OPENAI_EMBEDDINGS else "all-MiniLM-L6-v2"
 COLLECTION_NAME = "pdf_documents"
 
+# Ingestion settings
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))  # PDF loading processes
+INGEST_FILE_TIMEOUT = int(os.getenv("INGEST_FILE_TIMEOUT", "300"))  # seconds allowed per PDF
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # chunks per embedding call
+EMBED_FLUSH_BATCHES = 16  # length-sort and embed once this many batches are buffered
+INGEST_QUEUE_SIZE = 8  # items buffered between ingestion pipeline stages
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = 0.85  # estimated Jaccard similarity for near-duplicate chunks
+
+# Multimodal (image OCR) settings
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))  # 1 = OCR in-process
+OCR_TIMEOUT = int(os.getenv("OCR_TIMEOUT", "60"))  # seconds allowed per image
+
+# Retrieval settings
+# Seconds to wait for both hybrid search legs before fusing whichever finished (0 = no limit)
+HYBRID_LATENCY_BUDGET = float(os.getenv("HYBRID_LATENCY_BUDGET", "0"))
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "rrf")  # "rrf", "minmax" or "zscore"
+HYBRID_FAN_OUT = int(os.getenv("HYBRID_FAN_OUT", "2"))  # candidates per leg = k * fan-out
+BM25_PRUNING = os.getenv("BM25_PRUNING", "true").lower() == "true"  # MaxScore top-k for the BM25 leg
+BM25_POSITIONS = os.getenv("BM25_POSITIONS", "true").lower() == "true"  # index token positions for "phrase" queries
+BM25_STOPWORDS = os.getenv("BM25_STOPWORDS", "true").lower() == "true"  # drop common English words from BM25 terms
+BM25_STEMMING = os.getenv("BM25_STEMMING", "true").lower() == "true"  # light (plural) stemming of BM25 terms
+PHRASE_FILTER = os.getenv("PHRASE_FILTER", "false").lower() == "true"  # drop BM25 hits missing a quoted phrase
+PHRASE_BOOST = 1.0  # otherwise scale BM25 hits by 1 + boost per matched phrase
+
+# Query cache settings (in-memory tier in front of the cache/*.pkl files)
+QUERY_CACHE_ENTRIES = int(os.getenv("QUERY_CACHE_ENTRIES", "256"))
+QUERY_CACHE_BYTES = int(os.getenv("QUERY_CACHE_BYTES", str(64 * 1024 * 1024)))
+
 # LLM settings
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "anthropic")  # "openai" or "anthropic"
 LLM_MODEL = os.getenv("LLM_MODEL", "claude-sonnet-4-20250514")  # or "gpt-4", "claude-3-sonnet-20240229"
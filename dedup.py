@@ -0,0 +1,135 @@
+# dedup.py
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import List, Optional
+
+import numpy as np
+from langchain.schema import Document
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class ChunkDeduplicator:
+    """
+    Drop exact and near-duplicate chunks before they are embedded
+
+    Exact duplicates are caught by hashing the normalized text. Near duplicates
+    are found with MinHash signatures over word shingles, bucketed with LSH so
+    each new chunk is only compared against a handful of candidates.
+
+    Chunks are compared against everything seen since the last reset(), not
+    against the existing collection. Incremental ingestion resets it for each
+    file, so a kept chunk never stands in for one of another file that could
+    later be removed or changed on its own.
+    """
+
+    def __init__(self, threshold=0.85, num_perm=64, bands=8, shingle_size=3, seed=1):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity above which a chunk is a near duplicate
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands (num_perm must be divisible by it)
+            shingle_size: Words per shingle
+            seed: Seed for the permutation parameters
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.reset()
+        self.stats = {'kept': 0, 'exact': 0, 'near': 0, 'chars_removed': 0}
+
+    def reset(self):
+        """Forget the chunks seen so far, keeping the stats"""
+        self._exact = set()
+        self._signatures: List[np.ndarray] = []
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    @staticmethod
+    def _normalize(text):
+        return re.sub(r'\s+', ' ', text).strip().lower()
+
+    def _signature(self, words) -> Optional[np.ndarray]:
+        """MinHash signature of the word shingles, or None if the text is too short"""
+        if len(words) < self.shingle_size:
+            return None
+        shingles = {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # Universal hashing (a*x + b) mod p for every permutation at once
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def check(self, text) -> Optional[str]:
+        """
+        Classify a chunk and add it to the index if it is new
+
+        Returns:
+            'exact', 'near' or None for a chunk that should be kept
+        """
+        normalized = self._normalize(text)
+        digest = hashlib.sha1(normalized.encode('utf-8')).digest()
+        if digest in self._exact:
+            return 'exact'
+
+        signature = self._signature(normalized.split())
+        if signature is not None:
+            band_keys = [
+                signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+            candidates = set()
+            for band, key in enumerate(band_keys):
+                candidates.update(self._buckets[band].get(key, ()))
+            for candidate in candidates:
+                if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                    return 'near'
+
+            index = len(self._signatures)
+            self._signatures.append(signature)
+            for band, key in enumerate(band_keys):
+                self._buckets[band][key].append(index)
+
+        self._exact.add(digest)
+        return None
+
+    def filter(self, chunks: List[Document]) -> List[Document]:
+        """Return the chunks that are neither exact nor near duplicates of earlier ones"""
+        kept = []
+        for chunk in chunks:
+            verdict = self.check(chunk.page_content)
+            if verdict is None:
+                kept.append(chunk)
+                self.stats['kept'] += 1
+            else:
+                self.stats[verdict] += 1
+                self.stats['chars_removed'] += len(chunk.page_content)
+        return kept
+
+    def report(self) -> str:
+        removed = self.stats['exact'] + self.stats['near']
+        total = removed + self.stats['kept']
+        percent = 100.0 * removed / total if total else 0.0
+        return (
+            f"Deduplication removed {removed} of {total} chunks ({percent:.1f}%): "
+            f"{self.stats['exact']} exact, {self.stats['near']} near duplicates, "
+            f"{self.stats['chars_removed']} characters"
+        )
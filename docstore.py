@@ -0,0 +1,62 @@
+# docstore.py
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from langchain.schema import Document
+
+
+class ChunkStore:
+    """
+    Append-only JSON Lines store of ingested chunks, used as the hybrid search corpus
+
+    Chunks are written a batch at a time as ingestion progresses, so the full
+    corpus never has to be held in memory to persist it.
+    """
+
+    def __init__(self, store_path="cache/documents.jsonl"):
+        self.path = Path(store_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def append(self, chunks: Iterable[Document]):
+        """Append chunks to the end of the store"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(json.dumps({
+                    'page_content': chunk.page_content,
+                    'metadata': chunk.metadata
+                }) + "\n")
+
+    def iter_documents(self) -> Iterator[Document]:
+        """Stream the stored chunks back as Documents"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield Document(page_content=record['page_content'], metadata=record['metadata'])
+
+    def load_documents(self) -> List[Document]:
+        return list(self.iter_documents())
+
+    def remove_sources(self, sources):
+        """Drop every chunk whose metadata source is in sources, rewriting the file line by line"""
+        sources = set(sources)
+        if not sources or not self.path.exists():
+            return
+
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(self.path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+            for line in src:
+                if line.strip() and json.loads(line)['metadata'].get('source') not in sources:
+                    dst.write(line)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,118 @@
+# fusion.py
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from bm25_index import top_k_indices
+
+# Rank offset for reciprocal rank fusion, the value from the original RRF paper
+RRF_K = 60
+
+
+def doc_key(doc: Document) -> str:
+    """Key used to merge vector and BM25 hits for the same chunk"""
+    return doc.metadata.get('doc_id') or f"{doc.metadata.get('source')}:{doc.metadata.get('page')}:{hash(doc.page_content)}"
+
+
+def distance_to_similarity(distances: np.ndarray, space: str = 'l2') -> np.ndarray:
+    """
+    Turn Chroma distances (lower is better) into similarities (higher is better)
+
+    Args:
+        distances: Distances as returned by similarity_search_with_score
+        space: Distance function of the collection: 'l2', 'cosine' or 'ip'
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    if space == 'l2':
+        return 1.0 / (1.0 + distances)
+    # Chroma reports cosine and inner product as 1 - similarity
+    return 1.0 - distances
+
+
+def rrf(scores: np.ndarray) -> np.ndarray:
+    """Reciprocal rank fusion: only the rank of each hit counts, not its score"""
+    return 1.0 / (RRF_K + np.arange(1, len(scores) + 1))
+
+
+def min_max(scores: np.ndarray) -> np.ndarray:
+    """Rescale scores to [0, 1]; a list of equal scores maps to all ones"""
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def z_score(scores: np.ndarray) -> np.ndarray:
+    """Standardize scores to zero mean and unit variance"""
+    std = scores.std()
+    if std == 0:
+        return np.zeros_like(scores)
+    return (scores - scores.mean()) / std
+
+
+FUSION_STRATEGIES: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'rrf': rrf,
+    'minmax': min_max,
+    'zscore': z_score
+}
+
+
+def register_fusion(name: str, normalize: Callable[[np.ndarray], np.ndarray]):
+    """
+    Add a fusion strategy
+
+    Args:
+        name: Name to select the strategy by
+        normalize: Maps one leg's scores (higher is better, best first) to
+            values that are comparable across legs
+    """
+    FUSION_STRATEGIES[name] = normalize
+
+
+def fuse(vector_results: List[Tuple[Document, float]], bm25_results: List[Tuple[Document, float]],
+         alpha: float = 0.5, method: str = 'rrf', space: str = 'l2', k: Optional[int] = None) -> List[Tuple[Document, float]]:
+    """
+    Combine vector and BM25 hits into one ranking
+
+    Each leg is normalized on its own, then the legs are mixed with weights
+    alpha and 1 - alpha; a chunk found by both legs gets both contributions.
+    Candidates are grouped and summed as arrays and the top k picked by
+    partial selection, so only the k returned hits are ever sorted.
+
+    Args:
+        vector_results: (document, distance) tuples, best first
+        bm25_results: (document, BM25 score) tuples, best first
+        alpha: Weight for vector search (0-1)
+        method: Name of a strategy in FUSION_STRATEGIES
+        space: Distance function of the vector collection
+        k: Number of hits to return (None = all)
+
+    Returns:
+        List of (document, fused score) tuples, best first
+    """
+    if method not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion method '{method}', expected one of {sorted(FUSION_STRATEGIES)}")
+    normalize = FUSION_STRATEGIES[method]
+
+    legs = [
+        (vector_results, distance_to_similarity([score for _, score in vector_results], space), alpha),
+        (bm25_results, np.asarray([score for _, score in bm25_results], dtype=np.float64), 1 - alpha)
+    ]
+
+    docs = [doc for results, _, _ in legs for doc, _ in results]
+    if not docs:
+        return []
+    contributions = np.concatenate([weight * normalize(scores) for results, scores, weight in legs if results])
+
+    # Group hits of the same chunk; groups are renumbered in order of first
+    # appearance so ties favour the vector leg, then rank within each leg
+    keys = np.array([doc_key(doc) for doc in docs], dtype=object)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    fused = np.bincount(rank[inverse.ravel()], weights=contributions)
+    first = first[order]
+
+    return [(docs[first[group]], float(fused[group])) for group in top_k_indices(fused, k)]
@@ -1,22 +1,115 @@
 # hybrid_search.py
-import numpy as np  # This is what 'np' stands for
-from rank_bm25 import BM25Okapi
-from typing import List, Tuple, Dict
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Tuple, Optional
 from langchain.schema import Document
+from bm25_index import BM25Index, parse_query
+from fusion import fuse
 
-# Install required packages:
-# pip install numpy rank-bm25
+logger = logging.getLogger(__name__)
 
 class HybridRetriever:
-    def __init__(self, vectorstore, documents):
+    def __init__(self, vectorstore, documents: Optional[List[Document]] = None, bm25_index: Optional[BM25Index] = None,
+                 latency_budget: Optional[float] = None, max_workers: int = 4,
+                 fusion: str = 'rrf', fan_out: int = 2, distance_space: str = 'l2', bm25_pruning: bool = True,
+                 phrase_filter: bool = False, phrase_boost: float = 1.0):
+        """
+        Args:
+            vectorstore: Chroma vector store
+            documents: Chunks to build an in-memory BM25 index over
+            bm25_index: Prebuilt (usually memory-mapped) index; BM25 hits are
+                then fetched from the vector store by doc_id
+            latency_budget: Default seconds to wait for both search legs (None = no limit)
+            max_workers: Threads shared by the search legs of concurrent queries
+            fusion: Default fusion strategy, a name from fusion.FUSION_STRATEGIES
+            fan_out: Each leg fetches k * fan_out candidates
+            distance_space: Distance function of the Chroma collection
+            bm25_pruning: Use MaxScore pruning for the BM25 top k (same results)
+            phrase_filter: Drop BM25 hits that miss a "quoted phrase" of the query
+            phrase_boost: Otherwise boost BM25 hits by 1 + phrase_boost per matched phrase
+        """
         self.vectorstore = vectorstore
         self.documents = documents
+        self.latency_budget = latency_budget
+        self.fusion = fusion
+        self.fan_out = fan_out
+        self.distance_space = distance_space
+        self.bm25_pruning = bm25_pruning
+        self.phrase_filter = phrase_filter
+        self.phrase_boost = phrase_boost
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid-search")
         
         # Prepare BM25
-        tokenized_docs = [doc.page_content.lower().split() for doc in documents]
-        self.bm25 = BM25Okapi(tokenized_docs)
+        self.bm25 = bm25_index if bm25_index is not None else BM25Index.from_documents(documents or [], positions=True)
+    
+    def close(self):
+        """Shut down the search threads; searches already running are left to finish"""
+        self._executor.shutdown(wait=False)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _get_documents(self, indices) -> List[Optional[Document]]:
+        """Documents at the given BM25 index positions (None for ids missing from the store)"""
+        if self.documents is not None:
+            return [self.documents[i] for i in indices]
         
-    def search(self, query: str, k: int = 5, alpha: float = 0.5) -> List[Tuple[Document, float]]:
+        ids = [self.bm25.doc_ids[i] for i in indices]
+        if not ids:
+            return []
+        found = self.vectorstore.get(ids=ids, include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(found['ids'], found['documents'], found['metadatas'])
+        }
+        return [by_id.get(doc_id) for doc_id in ids]
+    
+    def _bm25_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Top k BM25 hits as (document, score) tuples, honouring "phrase" and "proximity"~N syntax"""
+        tokens, phrases = parse_query(query, self.bm25.analyzer)
+        indices, scores = self.bm25.top_k(
+            tokens,
+            k,
+            pruned=self.bm25_pruning,
+            phrases=phrases,
+            phrase_filter=self.phrase_filter,
+            phrase_boost=self.phrase_boost
+        )
+        return [(doc, score) for doc, score in zip(self._get_documents(indices), scores) if doc is not None]
+    
+    def _run_legs(self, query: str, k: int, latency_budget: Optional[float]):
+        """
+        Run the vector and BM25 searches concurrently
+        
+        With a latency budget, a leg that has not finished in time is left
+        running in the background and contributes no results. If neither leg
+        makes the budget, the first one to finish is used.
+        
+        Returns:
+            (vector_results, bm25_results)
+        """
+        futures = {
+            'vector': self._executor.submit(self.vectorstore.similarity_search_with_score, query, k=k),
+            'bm25': self._executor.submit(self._bm25_search, query, k)
+        }
+        done, _ = wait(futures.values(), timeout=latency_budget)
+        if not done:
+            done, _ = wait(futures.values(), return_when=FIRST_COMPLETED)
+        
+        results = {}
+        for leg, future in futures.items():
+            if future in done:
+                results[leg] = future.result()
+            else:
+                logger.warning(f"{leg} search exceeded the {latency_budget}s latency budget, fusing without it")
+                results[leg] = []
+        return results['vector'], results['bm25']
+        
+    def search(self, query: str, k: int = 5, alpha: float = 0.5,
+               latency_budget: Optional[float] = None, fusion: Optional[str] = None) -> List[Tuple[Document, float]]:
         """
         Hybrid search combining vector and BM25 search
         
@@ -24,51 +117,24 @@ class HybridRetriever:
             query: Search query
             k: Number of results to return
             alpha: Weight for vector search (0-1). Higher = more weight on vector search
+            latency_budget: Seconds to wait for both legs, overriding the retriever default
+            fusion: Fusion strategy ('rrf', 'minmax', 'zscore' or a registered
+                one), overriding the retriever default
         
         Returns:
-            List of (document, score) tuples
+            List of (document, fused score) tuples
         """
-        # Vector search
-        vector_results = self.vectorstore.similarity_search_with_score(query, k=k*2)
-        
-        # BM25 search
-        tokenized_query = query.lower().split()
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        bm25_top_indices = np.argsort(bm25_scores)[-k*2:][::-1]  # np.argsort sorts and returns indices
-        
-        # Combine scores
-        combined_results = {}
-        
-        # Add vector search results
-        for doc, score in vector_results:
-            doc_id = doc.metadata.get('doc_id', str(doc))
-            combined_results[doc_id] = {
-                'doc': doc,
-                'vector_score': score,
-                'bm25_score': 0,
-                'combined_score': score * alpha
-            }
-        
-        # Add BM25 results
-        for idx in bm25_top_indices:
-            doc = self.documents[idx]
-            doc_id = doc.metadata.get('doc_id', str(doc))
-            if doc_id in combined_results:
-                combined_results[doc_id]['bm25_score'] = bm25_scores[idx]
-                combined_results[doc_id]['combined_score'] += bm25_scores[idx] * (1 - alpha)
-            else:
-                combined_results[doc_id] = {
-                    'doc': doc,
-                    'vector_score': 0,
-                    'bm25_score': bm25_scores[idx],
-                    'combined_score': bm25_scores[idx] * (1 - alpha)
-                }
-        
-        # Sort by combined score
-        sorted_results = sorted(
-            combined_results.values(),
-            key=lambda x: x['combined_score'],
-            reverse=True
-        )[:k]
+        # Vector and BM25 search, run concurrently
+        if latency_budget is None:
+            latency_budget = self.latency_budget
+        vector_results, bm25_results = self._run_legs(query, k * self.fan_out, latency_budget)
         
-        return [(r['doc'], r['combined_score']) for r in sorted_results]
\ No newline at end of file
+        # Normalize each leg and combine
+        return fuse(
+            vector_results,
+            bm25_results,
+            alpha=alpha,
+            method=fusion or self.fusion,
+            space=self.distance_space,
+            k=k
+        )
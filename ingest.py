@@ -1,4 +1,9 @@
 import os
+import argparse
+import multiprocessing
+import queue
+import threading
+from collections import deque
 from pathlib import Path
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -6,8 +11,15 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 import chromadb
 # ingest.py (add this to your existing code)
-import pickle
+import hashlib
+import time
 from config import *
+from manifest import IngestManifest, IngestCheckpoint
+from cache import CachedEmbeddings, OCRCache, QueryCache
+from docstore import ChunkStore
+from dedup import ChunkDeduplicator
+from bm25_index import IncrementalBM25Index
+from analyzer import Analyzer, ENGLISH_STOPWORDS
 # ingest.py (updated section)
 from multimodal import MultiModalProcessor
 from langchain.schema import Document
@@ -15,25 +27,42 @@ from langchain.schema import Document
 
 def load_documents_multimodal():
     """Load all PDFs including images and tables"""
-    documents = []
     pdf_files = list(DATA_DIR.glob("*.pdf"))
     
     # Initialize multimodal processor
     # For Windows, you might need to specify tesseract path:
     # processor = MultiModalProcessor(tesseract_cmd=r'C:\Program Files\Tesseract-OCR\tesseract.exe')
-    processor = MultiModalProcessor()
+    # The processor owns the OCR worker pool, which is shut down on exit
+    ocr_cache = OCRCache()
+    with MultiModalProcessor(ocr_workers=OCR_WORKERS, ocr_timeout=OCR_TIMEOUT, ocr_cache=ocr_cache) as processor:
+        documents = _load_multimodal_files(processor, pdf_files)
+    print(processor.ocr_report())
+    print(f"OCR cache: {ocr_cache.hits} hits, {ocr_cache.misses} misses")
     
+    print(f"Loaded {len(documents)} total documents (including images and tables)")
+    return documents
+
+def _load_multimodal_files(processor, pdf_files):
+    """Turn the text, image OCR and tables of each PDF into Documents"""
+    documents = []
     for pdf_path in pdf_files:
         print(f"Processing {pdf_path.name}...")
         
-        # Regular text extraction (existing code)
-        loader = PyPDFLoader(str(pdf_path))
-        text_docs = loader.load()
-        documents.extend(text_docs)
-        
-        # Extract images and tables
+        # Text, images and tables in a single pass over the PDF
         multimodal_data = processor.process_pdf_complete(str(pdf_path))
         
+        # Page text, with the same metadata PyPDFLoader would produce
+        for text_data in multimodal_data['text']:
+            doc = Document(
+                page_content=text_data['content'],
+                metadata={
+                    'source': str(pdf_path),
+                    'page': text_data['page'] - 1,
+                    'type': 'text'
+                }
+            )
+            documents.append(doc)
+        
         # Add image OCR text as documents
         for img_data in multimodal_data['images']:
             doc = Document(
@@ -58,7 +87,6 @@ def load_documents_multimodal():
             )
             documents.append(doc)
     
-    print(f"Loaded {len(documents)} total documents (including images and tables)")
     return documents
 
 
@@ -80,64 +108,517 @@ def load_documents():
     print(f"Loaded {len(documents)} pages from {len(pdf_files)} PDFs")
     return documents
 
-def split_documents(documents):
-    """Split documents into chunks"""
-    text_splitter = RecursiveCharacterTextSplitter(
+def get_text_splitter():
+    """Create the text splitter used for all ingestion paths"""
+    return RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
         length_function=len,
-        separators=["\n\n", "\n", " ", ""]
+        separators=["\n\n", "\n", " ", ""],
+        add_start_index=True
     )
+
+def split_documents(documents):
+    """Split documents into chunks"""
+    text_splitter = get_text_splitter()
     
     chunks = text_splitter.split_documents(documents)
     print(f"Split into {len(chunks)} chunks")
     return chunks
 
-def create_vectorstore(chunks):
-    """Create and populate the vector store"""
+def _load_and_split_pdf(pdf_path):
+    """Load and split a single PDF (runs inside a worker process)"""
+    pages = PyPDFLoader(str(pdf_path)).load()
+    return len(pages), get_text_splitter().split_documents(pages)
+
+def iter_pdf_chunks(pdf_files, workers=INGEST_WORKERS, timeout=INGEST_FILE_TIMEOUT):
+    """
+    Load and split PDFs on a process pool, yielding results in input order
+    
+    Args:
+        pdf_files: Paths of the PDFs to ingest
+        workers: Number of worker processes
+        timeout: Seconds to wait for a single PDF before skipping it
+    
+    Yields:
+        (pdf_path, num_pages, chunks) tuples; chunks is None if the file failed
+    """
+    pdf_files = list(pdf_files)
+    if not pdf_files:
+        return
+    # Even a single PDF goes through the pool: only a worker process can be
+    # abandoned when a broken file hangs the parser
+    workers = max(1, min(workers, len(pdf_files)))
+    
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        remaining = iter(pdf_files)
+        pending = deque()
+        
+        # Keep a bounded window in flight so results stream back in order
+        # without queueing the whole corpus up front
+        for pdf_path in remaining:
+            pending.append((pdf_path, pool.apply_async(_load_and_split_pdf, (pdf_path,))))
+            if len(pending) >= workers * 2:
+                break
+        
+        while pending:
+            pdf_path, result = pending.popleft()
+            try:
+                num_pages, chunks = result.get(timeout=timeout)
+            except multiprocessing.TimeoutError:
+                print(f"Timed out after {timeout}s loading {pdf_path.name}, skipping")
+                num_pages, chunks = 0, None
+                # The hung worker would hold its slot for the rest of the run:
+                # kill the pool and resubmit the files that were still queued
+                pool.terminate()
+                pool.join()
+                pool = multiprocessing.Pool(processes=workers)
+                pending = deque(
+                    (queued_path, queued if queued.ready() else pool.apply_async(_load_and_split_pdf, (queued_path,)))
+                    for queued_path, queued in pending
+                )
+            except Exception as e:
+                print(f"Failed to load {pdf_path.name}: {e}")
+                num_pages, chunks = 0, None
+            
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, pool.apply_async(_load_and_split_pdf, (next_path,))))
+            
+            yield pdf_path, num_pages, chunks
+    finally:
+        # Terminating rather than closing, so a PDF that hangs past its
+        # timeout cannot keep the interpreter alive once the batch is done
+        pool.terminate()
+        pool.join()
+
+def get_embeddings():
+    """Create the embeddings model used for ingestion, backed by the on-disk embedding cache"""
     # Initialize embeddings (this will download the model on first run)
     print("Initializing embeddings model...")
     embeddings = HuggingFaceEmbeddings(
         model_name=EMBEDDING_MODEL,
-        model_kwargs={'device': 'cpu'}
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'batch_size': EMBED_BATCH_SIZE}
     )
+    return CachedEmbeddings(embeddings, EMBEDDING_MODEL)
+
+def create_vectorstore(chunks):
+    """Create and populate the vector store"""
+    embeddings = get_embeddings()
     
     # Create or update the vector store
     print("Creating vector store...")
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
+    vectorstore = Chroma(
         persist_directory=str(VECTORSTORE_DIR),
+        embedding_function=embeddings,
         collection_name=COLLECTION_NAME
     )
-
-        # Save documents for hybrid search
-    cache_dir = Path("cache")
-    cache_dir.mkdir(exist_ok=True)
     
-    with open(cache_dir / "documents.pkl", 'wb') as f:
-        pickle.dump(chunks, f)
+    if DEDUP_ENABLED:
+        deduplicator = ChunkDeduplicator(threshold=DEDUP_THRESHOLD)
+        chunks = deduplicator.filter(chunks)
+        print(deduplicator.report())
+    
+    # Assign doc_ids before storing so they end up in the collection and the chunk store
+    ids = assign_chunk_ids(chunks)
     
-    # Also save with doc_id for easier retrieval
-    for i, chunk in enumerate(chunks):
-        chunk.metadata['doc_id'] = f"doc_{i}"
+    # Save documents for hybrid search
+    chunk_store = ChunkStore()
+    chunk_store.clear()
+    embed_and_store(vectorstore, embeddings, chunks, ids, chunk_store=chunk_store)
+    build_bm25_index(chunk_store)
     
     print(f"Vector store created with {len(chunks)} chunks")
+    print(f"Embedding cache: {embeddings.hits} hits, {embeddings.misses} misses")
     return vectorstore
 
-def main():
-    print("Starting document ingestion...")
+def make_chunk_id(chunk):
+    """
+    Deterministic id for a chunk from its source, page, offset and content
     
-    # Load documents
-    documents = load_documents()
-    if not documents:
-        return
+    The same chunk of the same file always gets the same id, so re-ingesting
+    overwrites vectors instead of duplicating them.
+    """
+    metadata = chunk.metadata
+    content_hash = hashlib.sha256(chunk.page_content.encode('utf-8')).hexdigest()
+    key = f"{metadata.get('source', '')}\0{metadata.get('page', '')}\0{metadata.get('start_index', '')}\0{content_hash}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+def assign_chunk_ids(chunks):
+    """Set metadata['doc_id'] on each chunk and return the ids"""
+    ids = []
+    for chunk in chunks:
+        chunk.metadata['doc_id'] = make_chunk_id(chunk)
+        ids.append(chunk.metadata['doc_id'])
+    return ids
+
+def _token_length(text):
+    """Cheap token count estimate used to bucket chunks of similar length"""
+    return len(text.split())
+
+def iter_embedded_batches(embeddings, chunks, ids, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embed chunks in length-sorted batches
+    
+    Sorting by length first means each batch holds chunks of similar size, so
+    the encoder pads far less than with arbitrarily mixed batches.
+    
+    Yields:
+        (ids, chunks, vectors) for each batch
+    """
+    order = sorted(range(len(chunks)), key=lambda i: _token_length(chunks[i].page_content))
+    
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        batch_chunks = [chunks[i] for i in batch]
+        vectors = embeddings.embed_documents([chunk.page_content for chunk in batch_chunks])
+        yield [ids[i] for i in batch], batch_chunks, vectors
+
+def store_batch(vectorstore, ids, chunks, vectors, chunk_store=None):
+    """Upsert one embedded batch into the collection (and append it to the chunk store)"""
+    vectorstore._collection.upsert(
+        ids=ids,
+        embeddings=vectors,
+        documents=[chunk.page_content for chunk in chunks],
+        metadatas=[chunk.metadata for chunk in chunks]
+    )
+    if chunk_store is not None:
+        chunk_store.append(chunks)
+
+def embed_and_store(vectorstore, embeddings, chunks, ids, batch_size=EMBED_BATCH_SIZE, chunk_store=None):
+    """
+    Embed chunks in length-sorted batches and write them to the collection in bulk
+    
+    Args:
+        vectorstore: Chroma vector store to write to
+        embeddings: Embeddings used for the chunks
+        chunks: Documents to embed
+        ids: Collection ids, one per chunk
+        batch_size: Chunks per embedding call and per collection write
+        chunk_store: Optional ChunkStore that also receives the chunks
     
-    # Split into chunks
-    chunks = split_documents(documents)
+    Returns:
+        Number of chunks embedded per second
+    """
+    if not chunks:
+        return 0.0
+    
+    start_time = time.time()
+    for batch_ids, batch_chunks, vectors in iter_embedded_batches(embeddings, chunks, ids, batch_size):
+        store_batch(vectorstore, batch_ids, batch_chunks, vectors, chunk_store)
+    
+    elapsed = time.time() - start_time
+    rate = len(chunks) / elapsed if elapsed > 0 else float('inf')
+    print(f"Embedded {len(chunks)} chunks in {elapsed:.1f}s ({rate:.1f} chunks/s)")
+    return rate
+
+_STAGE_DONE = object()
+# Seconds between checks of the stop event while a stage waits on a queue
+_STAGE_POLL = 0.1
+
+class _StageError:
+    """Wraps an exception raised inside a pipeline stage thread"""
+    def __init__(self, error):
+        self.error = error
+
+def _start_stage(items, out_queue, stop):
+    """
+    Drain a generator into a bounded queue from a background thread
+    
+    The thread gives up as soon as stop is set, so a consumer that failed
+    cannot leave it blocked on a full queue. The generator is closed on the
+    way out, which runs its cleanup (e.g. terminating the loader pool).
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                out_queue.put(item, timeout=_STAGE_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def run():
+        try:
+            for item in items:
+                if not put(item):
+                    break
+        except BaseException as e:
+            put(_StageError(e))
+        finally:
+            items.close()
+            put(_STAGE_DONE)
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def _iter_queue(in_queue, stop=None):
+    """Consume a stage queue until its producer finishes or stop is set, re-raising its errors"""
+    while True:
+        try:
+            item = in_queue.get(timeout=_STAGE_POLL)
+        except queue.Empty:
+            if stop is not None and stop.is_set():
+                return
+            continue
+        if item is _STAGE_DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+def _embed_stage(loaded_files, embeddings, batch_size=EMBED_BATCH_SIZE, deduplicator=None):
+    """
+    Pipeline stage turning loaded files into embedded batches
+    
+    Files are buffered until EMBED_FLUSH_BATCHES batches worth of chunks are
+    pending, so small PDFs still fill whole batches. After the batches of a
+    flush, a 'files' item lists the files whose chunks are now all emitted;
+    a 'begin' item announces the same files before their first batch.
+    Duplicate chunks within a file are dropped by the deduplicator, if given,
+    before embedding. Duplicates across files are kept: the manifest tracks
+    chunks per file, so a chunk dropped in favour of another file's copy
+    would be lost for good once that file is removed or modified.
+    
+    Yields:
+        ('begin', {pdf_path: ids}), ('batch', (ids, chunks, vectors)),
+        ('files', [(pdf_path, num_pages, ids)]) or ('failed', pdf_path) items
+    """
+    pending = []
+    
+    def flush():
+        chunks = [chunk for _, _, file_chunks, _ in pending for chunk in file_chunks]
+        ids = [chunk_id for _, _, _, file_ids in pending for chunk_id in file_ids]
+        yield 'begin', {pdf_path: file_ids for pdf_path, _, _, file_ids in pending}
+        start_time = time.time()
+        for batch in iter_embedded_batches(embeddings, chunks, ids, batch_size):
+            yield 'batch', batch
+        elapsed = time.time() - start_time
+        if chunks:
+            rate = len(chunks) / elapsed if elapsed > 0 else float('inf')
+            print(f"Embedded {len(chunks)} chunks in {elapsed:.1f}s ({rate:.1f} chunks/s)")
+        yield 'files', [(pdf_path, num_pages, file_ids) for pdf_path, num_pages, _, file_ids in pending]
+        pending.clear()
+    
+    for pdf_path, num_pages, chunks in loaded_files:
+        if chunks is None:
+            yield 'failed', pdf_path
+            continue
+        
+        loaded = len(chunks)
+        if deduplicator is not None:
+            deduplicator.reset()
+            chunks = deduplicator.filter(chunks)
+        ids = assign_chunk_ids(chunks)
+        
+        print(f"Loaded {pdf_path.name} ({num_pages} pages, {len(chunks)} of {loaded} chunks kept)")
+        pending.append((pdf_path, num_pages, chunks, ids))
+        
+        if sum(len(file_ids) for _, _, _, file_ids in pending) >= batch_size * EMBED_FLUSH_BATCHES:
+            yield from flush()
+    
+    if pending:
+        yield from flush()
+
+def get_analyzer():
+    """Analyzer for the BM25 index, from the BM25_* settings"""
+    return Analyzer(
+        stopwords=ENGLISH_STOPWORDS if BM25_STOPWORDS else (),
+        stem=BM25_STEMMING
+    )
+
+def build_bm25_index(chunk_store):
+    """Rebuild the persistent BM25 index from the chunk store, streaming over it"""
+    start_time = time.time()
+    index = IncrementalBM25Index(positions=BM25_POSITIONS, analyzer=get_analyzer())
+    index.rebuild((doc.metadata['doc_id'], doc.page_content) for doc in chunk_store.iter_documents())
+    index.save()
+    print(f"BM25 index built over {len(index)} chunks in {time.time() - start_time:.1f}s")
+    return index
+
+def _open_vectorstore(embeddings):
+    return Chroma(
+        persist_directory=str(VECTORSTORE_DIR),
+        embedding_function=embeddings,
+        collection_name=COLLECTION_NAME
+    )
+
+def update_vectorstore(workers=INGEST_WORKERS, timeout=INGEST_FILE_TIMEOUT, restart=False):
+    """
+    Incrementally sync the vector store with the PDFs in the data directory
+    
+    Only new or modified files are loaded and embedded; chunks belonging to
+    modified or removed files are deleted from the collection first. Loading,
+    embedding and writing run as concurrent stages joined by bounded queues,
+    so peak memory depends on the queue sizes rather than the corpus size.
+    
+    The BM25 index is updated alongside the collection (stale chunks deleted,
+    new ones added) and saved at each commit, so the two never drift apart.
+    
+    Progress is committed to the manifest after every embedding flush, so an
+    interrupted run resumes from the last commit; chunks it wrote past that
+    point are found through the checkpoint and removed before continuing.
+    
+    Args:
+        workers: Number of PDF loading processes
+        timeout: Seconds allowed per PDF
+        restart: Discard all previous progress and re-ingest every PDF
+    
+    Returns:
+        Summary dict with file, page and chunk counts
+    """
+    manifest = IngestManifest()
+    checkpoint = IngestCheckpoint()
+    chunk_store = ChunkStore()
+    embeddings = get_embeddings()
+    vectorstore = _open_vectorstore(embeddings)
+    bm25 = IncrementalBM25Index.load()
+    # Index settings changed: terms or positions would not match, rebuild
+    if bm25 is not None and (bm25.positions != BM25_POSITIONS or
+                             bm25.analyzer.config() != get_analyzer().config()):
+        bm25 = None
+    
+    # A populated collection without a manifest was written before ingestion
+    # was incremental, under random ids; upserting would duplicate every vector
+    if not restart and not manifest.entries and vectorstore._collection.count() > 0:
+        print("Vector store has no ingest manifest, re-ingesting from scratch")
+        restart = True
+    
+    # cache/documents.pkl comes from the same older versions; its chunks have
+    # no doc_id and match no collection ids, so they are not worth migrating
+    legacy_cache = Path("cache", "documents.pkl")
+    if not restart and legacy_cache.exists():
+        print("Found cache/documents.pkl from an older version, re-ingesting from scratch")
+        restart = True
+    
+    if restart:
+        print("Restarting ingestion from scratch...")
+        vectorstore.delete_collection()
+        vectorstore = _open_vectorstore(embeddings)
+        manifest.clear()
+        checkpoint.clear()
+        chunk_store.clear()
+        bm25 = None
+        legacy_cache.unlink(missing_ok=True)
+    
+    # A manifest without a collection behind it (e.g. vectorstore/ was wiped)
+    # would make every file look up to date
+    if manifest.entries and vectorstore._collection.count() == 0:
+        print("Vector store is empty, ignoring existing manifest")
+        manifest.clear()
+        chunk_store.clear()
+        bm25 = None
+    
+    # Clean up after an interrupted run: files that made it into the manifest
+    # were committed, anything else was only partially written
+    if checkpoint.in_flight:
+        partial = {
+            key: ids for key, ids in checkpoint.in_flight.items()
+            if manifest.chunk_ids(key) != ids
+        }
+        if partial:
+            print(f"Resuming interrupted run, discarding partial chunks of {len(partial)} PDFs...")
+            partial_ids = [chunk_id for ids in partial.values() for chunk_id in ids]
+            if partial_ids:
+                vectorstore.delete(ids=partial_ids)
+                if bm25 is not None:
+                    bm25.delete(partial_ids)
+            chunk_store.remove_sources(partial.keys())
+        checkpoint.clear()
+    
+    # The BM25 index follows the collection chunk by chunk from here on;
+    # it is only rebuilt when missing or when the collection was reset
+    if bm25 is None:
+        bm25 = build_bm25_index(chunk_store)
+    
+    pdf_files = sorted(DATA_DIR.glob("*.pdf"))
+    changed, removed = manifest.diff(pdf_files)
+    summary = {
+        'added': 0,
+        'removed': len(removed),
+        'unchanged': len(pdf_files) - len(changed),
+        'failed': 0,
+        'pages': 0,
+        'chunks': 0
+    }
+    print(f"{len(changed)} new or modified, {len(removed)} removed, {summary['unchanged']} unchanged PDFs")
+    
+    # Delete chunks of files that are gone or about to be re-ingested
+    stale_keys = removed + [str(pdf_path) for pdf_path in changed if str(pdf_path) in manifest.entries]
+    stale_ids = [chunk_id for key in stale_keys for chunk_id in manifest.chunk_ids(key)]
+    if stale_ids:
+        print(f"Deleting {len(stale_ids)} stale chunks...")
+        vectorstore.delete(ids=stale_ids)
+        bm25.delete(stale_ids)
+    chunk_store.remove_sources(stale_keys)
+    for key in removed:
+        manifest.remove(key)
+    bm25.save()
+    manifest.save()
+    
+    # load/split -> embed -> write, each stage bounded by its input queue
+    load_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    store_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    # Set on the way out so the stages, and the loader pool, always shut down
+    stop = threading.Event()
+    _start_stage(iter_pdf_chunks(changed, workers, timeout), load_queue, stop)
+    deduplicator = ChunkDeduplicator(threshold=DEDUP_THRESHOLD) if DEDUP_ENABLED else None
+    _start_stage(_embed_stage(_iter_queue(load_queue, stop), embeddings, deduplicator=deduplicator), store_queue, stop)
+    
+    try:
+        for kind, payload in _iter_queue(store_queue):
+            if kind == 'begin':
+                checkpoint.begin(payload)
+            elif kind == 'batch':
+                store_batch(vectorstore, *payload, chunk_store=chunk_store)
+                bm25.add_documents(payload[1])
+            elif kind == 'files':
+                for pdf_path, num_pages, ids in payload:
+                    manifest.record(pdf_path, ids)
+                    summary['added'] += 1
+                    summary['pages'] += num_pages
+                    summary['chunks'] += len(ids)
+                # Commit point: everything up to here survives a crash
+                bm25.save()
+                manifest.save()
+                checkpoint.commit(pdf_path for pdf_path, _, _ in payload)
+            elif kind == 'failed':
+                summary['failed'] += 1
+                manifest.remove(payload)
+    finally:
+        stop.set()
+    
+    bm25.save()
+    manifest.save()
+    # Cached search results predate the change; the app also clears its memory tier
+    if changed or removed:
+        QueryCache().clear()
+    
+    if deduplicator is not None:
+        summary['duplicates'] = deduplicator.stats['exact'] + deduplicator.stats['near']
+        print(deduplicator.report())
+    print(f"Vector store updated: {summary['chunks']} chunks added from {summary['added']} PDFs")
+    print(f"Embedding cache: {embeddings.hits} hits, {embeddings.misses} misses")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest PDFs into the vector store")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true",
+                      help="Continue from the last checkpoint (default)")
+    mode.add_argument("--restart", action="store_true",
+                      help="Discard previous progress and re-ingest every PDF")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="Number of PDF loading processes")
+    args = parser.parse_args()
+    
+    print("Starting document ingestion...")
     
-    # Create vector store
-    vectorstore = create_vectorstore(chunks)
+    # Embed only new or modified PDFs, picking up where an interrupted run stopped
+    summary = update_vectorstore(workers=args.workers, restart=args.restart)
     
     print("\nIngestion complete!")
     print(f"Vector store saved to: {VECTORSTORE_DIR}")
@@ -0,0 +1,68 @@
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from bm25_index import BM25Index
+
+# Compares exhaustive BM25 top-k against MaxScore pruning on a synthetic
+# corpus. Each chunk mixes background words drawn from a Zipf-like
+# distribution with words from one topic, so content terms are bursty the way
+# they are in real documents. No PDFs or API keys needed.
+
+parser = argparse.ArgumentParser(description="Benchmark BM25 top-k retrieval")
+parser.add_argument("--docs", type=int, default=200000, help="Number of synthetic chunks")
+parser.add_argument("--vocab", type=int, default=50000, help="Vocabulary size")
+parser.add_argument("--topics", type=int, default=1000, help="Number of topics")
+parser.add_argument("--topic-share", type=float, default=0.3, help="Share of each chunk drawn from its topic")
+parser.add_argument("--queries", type=int, default=200, help="Number of queries per query length")
+parser.add_argument("--k", type=int, default=10, help="Results per query")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+rng = np.random.default_rng(args.seed)
+term_probs = 1.0 / np.arange(1, args.vocab + 1)
+term_probs /= term_probs.sum()
+topics = rng.integers(0, args.vocab, size=(args.topics, 50))
+
+
+def random_terms(n):
+    topic = topics[rng.integers(args.topics)]
+    from_topic = rng.random(n) < args.topic_share
+    terms = rng.choice(args.vocab, size=n, p=term_probs)
+    terms[from_topic] = rng.choice(topic, size=int(from_topic.sum()))
+    return [f"t{term}" for term in terms]
+
+
+print("Lexical Retrieval Benchmark")
+print("=" * 50)
+
+print(f"\nBuilding index over {args.docs} synthetic chunks...")
+start = time.time()
+index = BM25Index.build(
+    (str(i), " ".join(random_terms(int(rng.integers(50, 200)))))
+    for i in range(args.docs)
+)
+print(f"Built in {time.time() - start:.1f}s ({len(index.doc_idx)} postings, {len(index.vocab)} terms)")
+
+for query_length in (2, 5, 10, 20):
+    queries = [random_terms(query_length) for _ in range(args.queries)]
+    timings = {False: [], True: []}
+    mismatches = 0
+
+    for query in queries:
+        results = {}
+        for pruned in (False, True):
+            start = time.perf_counter()
+            results[pruned] = index.top_k(query, args.k, pruned=pruned)
+            timings[pruned].append(time.perf_counter() - start)
+        if not np.allclose(results[False][1], results[True][1]):
+            mismatches += 1
+
+    exhaustive = statistics.mean(timings[False]) * 1000
+    maxscore = statistics.mean(timings[True]) * 1000
+    print(f"\n{query_length}-term queries:")
+    print(f"Exhaustive: {exhaustive:.2f}ms  p95 {np.percentile(timings[False], 95) * 1000:.2f}ms")
+    print(f"MaxScore:   {maxscore:.2f}ms  p95 {np.percentile(timings[True], 95) * 1000:.2f}ms")
+    print(f"Speedup: {exhaustive / maxscore:.1f}x, result mismatches: {mismatches}")
@@ -0,0 +1,145 @@
+# manifest.py
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+class IngestManifest:
+    """
+    Persistent record of which PDFs have been ingested and the chunks they produced
+
+    Each entry is keyed by the PDF path and stores its size, mtime, content hash
+    and the ids of its chunks in the vector store, so ingestion can skip files
+    that have not changed and delete the chunks of files that have.
+    """
+
+    def __init__(self, manifest_path="cache/ingest_manifest.json"):
+        self.path = Path(manifest_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+
+    @staticmethod
+    def file_hash(path, block_size=1 << 20) -> str:
+        """SHA-256 of the file contents, read in blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def diff(self, pdf_files) -> Tuple[List[Path], List[str]]:
+        """
+        Compare the files on disk against the manifest
+
+        Files whose size and mtime are unchanged are trusted without hashing;
+        otherwise the content hash decides whether the file really changed.
+
+        Args:
+            pdf_files: Paths of the PDFs currently in the data directory
+
+        Returns:
+            (changed, removed) where changed lists new or modified files and
+            removed lists manifest keys whose files no longer exist
+        """
+        changed = []
+        current = set()
+
+        for pdf_path in pdf_files:
+            key = str(pdf_path)
+            current.add(key)
+            entry = self.entries.get(key)
+            stat = os.stat(pdf_path)
+
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                continue
+
+            if entry and entry['sha256'] == self.file_hash(pdf_path):
+                # Touched but not modified - refresh the stat fields only
+                entry['size'] = stat.st_size
+                entry['mtime'] = stat.st_mtime
+                continue
+
+            changed.append(pdf_path)
+
+        removed = [key for key in self.entries if key not in current]
+        return changed, removed
+
+    def chunk_ids(self, key) -> List[str]:
+        """Chunk ids recorded for a file, or an empty list"""
+        entry = self.entries.get(str(key))
+        return list(entry['chunk_ids']) if entry else []
+
+    def record(self, pdf_path, chunk_ids: List[str]):
+        """Record a freshly ingested file"""
+        stat = os.stat(pdf_path)
+        self.entries[str(pdf_path)] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': self.file_hash(pdf_path),
+            'chunk_ids': list(chunk_ids)
+        }
+
+    def remove(self, key):
+        """Forget a file"""
+        self.entries.pop(str(key), None)
+
+    def clear(self):
+        """Forget every file"""
+        self.entries = {}
+
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half-written"""
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+class IngestCheckpoint:
+    """
+    Chunks written by an ingestion run that are not yet committed to the manifest
+
+    The ids of each group of files are recorded before their chunks are written
+    and dropped once the manifest has been saved, so a run that dies in between
+    leaves behind exactly the ids that need cleaning up before resuming.
+    """
+
+    def __init__(self, checkpoint_path="cache/ingest_checkpoint.json"):
+        self.path = Path(checkpoint_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.in_flight: Dict[str, List[str]] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.in_flight = json.load(f).get('in_flight', {})
+
+    def begin(self, files: Dict[str, List[str]]):
+        """Record files whose chunks are about to be written"""
+        self.in_flight.update({str(key): list(ids) for key, ids in files.items()})
+        self.save()
+
+    def commit(self, keys):
+        """Forget files whose chunks are now recorded in the manifest"""
+        for key in keys:
+            self.in_flight.pop(str(key), None)
+        self.save()
+
+    def clear(self):
+        self.in_flight = {}
+        if self.path.exists():
+            self.path.unlink()
+
+    def save(self):
+        if not self.in_flight:
+            self.clear()
+            return
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'in_flight': self.in_flight}, f)
+        os.replace(tmp_path, self.path)
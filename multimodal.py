@@ -1,121 +1,544 @@
 # multimodal.py
-import io  # This is what was missing!
 import fitz  # PyMuPDF
 from PIL import Image
 import pytesseract
+import numpy as np
+import math
+import multiprocessing
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 import logging
+from cache import OCRCache
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+
+def _init_ocr_worker(tesseract_cmd: Optional[str]):
+    """Configure tesseract in a freshly started OCR worker process"""
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_image(img_data: Tuple[int, int, bytes], lang: str, config: str, timeout: int) -> Tuple[str, float]:
+    """OCR one raw grayscale image, returning the text and seconds spent (runs in the calling process or an OCR worker)"""
+    start_time = time.time()
+    width, height, samples = img_data
+    # Wrap the pixmap samples directly - no PNG encode/decode round-trip
+    img_pil = Image.frombuffer("L", (width, height), samples, "raw", "L", 0, 1)
+    # pytesseract kills the tesseract process itself once the timeout expires
+    text = pytesseract.image_to_string(img_pil, lang=lang, config=config, timeout=timeout)
+    return text, time.time() - start_time
+
+
+def _tables_to_text(tables) -> List[str]:
+    """Render PyMuPDF tables as pipe-separated rows, dropping empty ones"""
+    texts = []
+    for table in tables:
+        table_text = "\n".join(
+            " | ".join(cell.strip() if cell else "" for cell in row)
+            for row in table.extract()
+        )
+        if table_text.strip():
+            texts.append(table_text)
+    return texts
+
+
+def _pymupdf_page_tables(pdf_path: str, page_num: int) -> List[str]:
+    """Find the tables on one page with PyMuPDF (runs in a worker process)"""
+    with fitz.open(pdf_path) as doc:
+        return _tables_to_text(doc[page_num].find_tables().tables)
+
+
+def _camelot_page_tables(pdf_path: str, page_num: int) -> List[str]:
+    """Find the tables on one page with camelot (runs in a worker process)"""
+    import camelot  # pip install camelot-py[cv]
+    # Convert table to string format
+    return [table.df.to_string() for table in camelot.read_pdf(pdf_path, pages=str(page_num + 1))]
+
+
 class MultiModalProcessor:
-    def __init__(self, tesseract_cmd: Optional[str] = None):
+    # Pre-filter thresholds for images unlikely to contain text
+    MIN_IMAGE_SIDE = 32  # pixels
+    MAX_ASPECT_RATIO = 25.0
+    INK_CONTRAST = 48  # gray levels between ink and paper, and across an edge
+    MIN_INK_RATIO = 0.005  # share of inked pixels within their bounding box; below this it is blank
+    MIN_EDGE_DENSITY = 0.02  # fraction of sharp transitions within the inked area; text is full of them
+    MIN_TABLE_LINES = 3  # horizontal and vertical ruling lines needed to look for tables
+    MAX_OCR_SIDE = 3000  # pixels; larger images are downscaled before OCR
+    PHOTO_ENTROPY = 5.0  # bits; above this, with no dominant tones, it is a photo
+    MIN_TWO_TONE_RATIO = 0.5  # share of pixels in the two most common tones
+    
+    def __init__(self, tesseract_cmd: Optional[str] = None, ocr_workers: int = 1, ocr_timeout: int = 60,
+                 ocr_lang: str = 'eng', ocr_config: str = '', ocr_cache=None, prefilter: bool = True,
+                 table_time_budget: float = 120.0):
         """
         Initialize the multimodal processor
         
         Args:
             tesseract_cmd: Path to tesseract executable (if not in PATH)
+            ocr_workers: Number of OCR and table worker processes (1 runs everything in this process)
+            ocr_timeout: Seconds allowed for OCR of a single image
+            ocr_lang: Tesseract language(s)
+            ocr_config: Extra tesseract command line options
+            ocr_cache: Optional cache.OCRCache reused across documents and runs
+            prefilter: Skip images that are unlikely to contain text
+            table_time_budget: Seconds of table extraction allowed per document
         """
         # Configure tesseract if needed (especially for Windows)
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         
+        self.tesseract_cmd = tesseract_cmd
+        self.ocr_workers = ocr_workers
+        self.ocr_timeout = ocr_timeout
+        self.ocr_lang = ocr_lang
+        self.ocr_config = ocr_config
+        self.ocr_cache = ocr_cache
+        self.prefilter = prefilter
+        self.table_time_budget = table_time_budget
+        self._pool = None
+        self.stats = {
+            'images': 0,
+            'skipped': 0,
+            'skip_reasons': {},
+            'ocr_calls': 0,
+            'ocr_seconds': 0.0
+        }
+    
+    def close(self):
+        """Shut down the OCR worker pool, killing any OCR still running"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def ocr_report(self) -> str:
+        """Summary of images seen, skipped by the pre-filter and OCR time (saved)"""
+        stats = self.stats
+        avg = stats['ocr_seconds'] / stats['ocr_calls'] if stats['ocr_calls'] else 0.0
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(stats['skip_reasons'].items()))
+        return (
+            f"Images: {stats['images']} seen, {stats['skipped']} skipped by pre-filter"
+            f"{f' ({reasons})' if reasons else ''}; "
+            f"{stats['ocr_calls']} OCR calls took {stats['ocr_seconds']:.1f}s, "
+            f"~{stats['skipped'] * avg:.1f}s saved"
+        )
+    
+    def _skip_reason(self, pix) -> Optional[str]:
+        """
+        Cheap check for images that are unlikely to contain text
+        
+        Looks at size and aspect ratio first, then at a downscaled grayscale
+        copy: near-blank images (almost no ink), smooth images (few edges)
+        and photos (high entropy without a dominant ink/paper pair of tones).
+        Each downscaled pixel keeps the inkiest tone of its block, so thin
+        strokes survive, and ink and edges are measured within the bounding
+        box of the inked pixels, so a few lines on a large scan still count.
+        
+        Returns:
+            The reason to skip the image, or None to OCR it
+        """
+        width, height = pix.width, pix.height
+        if min(width, height) < self.MIN_IMAGE_SIDE:
+            return 'too_small'
+        if max(width, height) / min(width, height) > self.MAX_ASPECT_RATIO:
+            return 'aspect_ratio'
+        
+        channels = pix.n - pix.alpha
+        rows = np.frombuffer(pix.samples, dtype=np.uint8).reshape(height, pix.stride)
+        pixels = rows[:, :width * pix.n].reshape(height, width, pix.n)
+        step = max(1, max(width, height) // 256)
+        if channels == 1:
+            gray = pixels[:, :, 0]
+        else:
+            gray = (pixels[:, :, :channels].sum(axis=2, dtype=np.uint16) // channels).astype(np.uint8)
+        sample = gray[::step, ::step]
+        
+        # Dark ink on light paper keeps each block's minimum, light on dark its maximum
+        kept_height, kept_width = height // step * step, width // step * step
+        blocks = gray[:kept_height, :kept_width].reshape(kept_height // step, step, kept_width // step, step)
+        if np.median(sample) >= 128:
+            gray = blocks.min(axis=(1, 3)).astype(np.int16)
+        else:
+            gray = blocks.max(axis=(1, 3)).astype(np.int16)
+        
+        counts = np.bincount(gray.ravel() // 16, minlength=16)
+        paper = counts.argmax() * 16 + 8
+        ink = np.abs(gray - paper) > self.INK_CONTRAST
+        if not ink.any():
+            return 'blank'
+        
+        # Judge the inked area only, not the margins around it
+        inked_rows, inked_cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+        box = slice(inked_rows[0], inked_rows[-1] + 1), slice(inked_cols[0], inked_cols[-1] + 1)
+        gray = gray[box]
+        if ink[box].mean() < self.MIN_INK_RATIO:
+            return 'blank'
+        
+        edges = (
+            (np.abs(np.diff(gray, axis=1)) > self.INK_CONTRAST).sum()
+            + (np.abs(np.diff(gray, axis=0)) > self.INK_CONTRAST).sum()
+        )
+        if edges / gray.size < self.MIN_EDGE_DENSITY:
+            return 'no_edges'
+        
+        # Tone statistics come from plain samples; block minima would skew them dark
+        sample = sample[box]
+        counts = np.bincount(sample.ravel() // 16, minlength=16)
+        probs = counts[counts > 0] / sample.size
+        entropy = float(-(probs * np.log2(probs)).sum()) * 2  # scale 16 bins to an 8-bit range
+        two_tone = np.sort(counts)[-2:].sum() / sample.size
+        if entropy > self.PHOTO_ENTROPY and two_tone < self.MIN_TWO_TONE_RATIO:
+            return 'photo'
+        
+        return None
+    
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                processes=self.ocr_workers,
+                initializer=_init_ocr_worker,
+                initargs=(self.tesseract_cmd,)
+            )
+        return self._pool
+    
     def extract_images_from_pdf(self, pdf_path: str) -> List[Dict]:
         """
         Extract images and their text from PDF
         
         Args:
             pdf_path: Path to PDF file
-            
+        
         Returns:
             List of dictionaries containing image data and extracted text
         """
         try:
             doc = fitz.open(pdf_path)
-            images_data = []
             
-            for page_num, page in enumerate(doc):
-                image_list = page.get_images()
-                
-                for img_index, img in enumerate(image_list):
-                    try:
-                        # Get image
-                        xref = img[0]
-                        pix = fitz.Pixmap(doc, xref)
-                        
-                        if pix.n - pix.alpha < 4:  # GRAY or RGB
-                            # Convert to PNG bytes
-                            img_data = pix.tobytes("png")
-                            
-                            # Convert to PIL Image using io.BytesIO
-                            img_pil = Image.open(io.BytesIO(img_data))
-                            
-                            # Extract text from image using OCR
-                            try:
-                                text = pytesseract.image_to_string(img_pil)
-                                
-                                # Only add if we got meaningful text
-                                if text.strip():
-                                    images_data.append({
-                                        'page': page_num + 1,  # 1-indexed
-                                        'image_index': img_index,
-                                        'text': text.strip(),
-                                        'type': 'image_ocr',
-                                        'source': Path(pdf_path).name
-                                    })
-                                    logger.info(f"Extracted text from image on page {page_num + 1}")
-                            
-                            except Exception as e:
-                                logger.warning(f"OCR failed for image on page {page_num + 1}: {e}")
-                        
-                        pix = None  # Free memory
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to process image {img_index} on page {page_num + 1}: {e}")
+            seen_xrefs = {}
+            jobs = (
+                job
+                for page_num, page in enumerate(doc)
+                for job in self._collect_page_images(doc, page, page_num, seen_xrefs)
+            )
+            images_data = self._run_ocr(jobs, pdf_path)
             
             doc.close()
             return images_data
-            
+        
         except Exception as e:
             logger.error(f"Failed to process PDF {pdf_path}: {e}")
             return []
     
-    def extract_tables_from_pdf(self, pdf_path: str) -> List[Dict]:
+    def _collect_page_images(self, doc, page, page_num: int, seen_xrefs: Dict[int, str]) -> List[Tuple]:
         """
-        Extract tables from PDF (requires additional libraries)
+        Turn the images on one page of an already opened document into OCR jobs
+        
+        Each job is (page_num, img_index, digest, (width, height, samples)) with
+        the raw samples of the grayscale image tesseract will see. The digest
+        covers those pixels and the tesseract settings; images whose xref was
+        already seen in this document get None instead of the image and reuse
+        the earlier result.
         """
-        try:
-            import camelot  # pip install camelot-py[cv]
-            
-            tables = camelot.read_pdf(pdf_path, pages='all')
-            tables_data = []
+        jobs = []
+        image_list = page.get_images()
+        
+        for img_index, img in enumerate(image_list):
+            try:
+                # Get image
+                xref = img[0]
+                if xref in seen_xrefs:
+                    if seen_xrefs[xref] is not None:
+                        jobs.append((page_num, img_index, seen_xrefs[xref], None))
+                    continue
+                
+                pix = fitz.Pixmap(doc, xref)
+                self.stats['images'] += 1
+                seen_xrefs[xref] = None
+                
+                if pix.n - pix.alpha < 4:  # GRAY or RGB
+                    pix = self._prepare_pixmap(pix)
+                    skip_reason = self._skip_reason(pix) if self.prefilter else None
+                    
+                    if skip_reason:
+                        self.stats['skipped'] += 1
+                        self.stats['skip_reasons'][skip_reason] = self.stats['skip_reasons'].get(skip_reason, 0) + 1
+                    else:
+                        digest = self._image_digest(pix)
+                        seen_xrefs[xref] = digest
+                        jobs.append((page_num, img_index, digest, (pix.width, pix.height, pix.samples)))
+                
+                pix = None  # Free memory
             
-            for i, table in enumerate(tables):
-                # Convert table to string format
-                table_text = table.df.to_string()
+            except Exception as e:
+                logger.error(f"Failed to process image {img_index} on page {page_num + 1}: {e}")
+        
+        return jobs
+    
+    def _prepare_pixmap(self, pix):
+        """Convert a pixmap to packed 8-bit grayscale and shrink oversized images, once"""
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)  # drop alpha
+        if pix.n != 1:
+            pix = fitz.Pixmap(fitz.csGRAY, pix)
+        
+        longest = max(pix.width, pix.height)
+        if longest > self.MAX_OCR_SIDE:
+            # shrink(n) halves both sides n times, in place
+            pix.shrink(math.ceil(math.log2(longest / self.MAX_OCR_SIDE)))
+        return pix
+    
+    def _image_digest(self, pix) -> str:
+        """Cache key for a pixmap: its raw samples plus the OCR settings"""
+        return OCRCache.make_key(pix.samples_mv, pix.width, pix.height, pix.n, self.ocr_lang, self.ocr_config)
+    
+    def _run_ocr(self, jobs: Iterable[Tuple], pdf_path: str) -> List[Dict]:
+        """
+        OCR image jobs, on the worker pool when one is configured
+        
+        Jobs are submitted through a bounded window and collected in
+        submission order, so results come back in page order without
+        holding every image of the document in memory at once. Each distinct
+        image is OCR'd at most once: repeats within the document wait for the
+        first result, and results already in the OCR cache are not recomputed.
+        """
+        images_data = []
+        known = {}  # digest -> text for images finished in this document
+        submitted = set()  # digests with OCR in flight
+        
+        def collect(page_num, img_index, digest, run_ocr):
+            try:
+                if run_ocr is None:
+                    text = known.get(digest)
+                    if text is None:  # OCR of the first occurrence failed
+                        return
+                else:
+                    text, seconds = run_ocr()
+                    self.stats['ocr_calls'] += 1
+                    self.stats['ocr_seconds'] += seconds
+                    known[digest] = text
+                    if self.ocr_cache is not None:
+                        self.ocr_cache.set(digest, text)
                 
+                # Only add if we got meaningful text
+                if text.strip():
+                    images_data.append({
+                        'page': page_num + 1,  # 1-indexed
+                        'image_index': img_index,
+                        'text': text.strip(),
+                        'type': 'image_ocr',
+                        'source': Path(pdf_path).name
+                    })
+                    logger.info(f"Extracted text from image on page {page_num + 1}")
+            
+            except multiprocessing.TimeoutError:
+                logger.warning(f"OCR timed out for image on page {page_num + 1}")
+            except Exception as e:
+                logger.warning(f"OCR failed for image on page {page_num + 1}: {e}")
+        
+        def needs_ocr(digest):
+            if digest in known or digest in submitted:
+                return False
+            if self.ocr_cache is not None:
+                cached = self.ocr_cache.get(digest)
+                if cached is not None:
+                    known[digest] = cached
+                    return False
+            return True
+        
+        if self.ocr_workers <= 1:
+            for page_num, img_index, digest, img_data in jobs:
+                run_ocr = None
+                if needs_ocr(digest) and img_data is not None:
+                    run_ocr = lambda: _ocr_image(img_data, self.ocr_lang, self.ocr_config, self.ocr_timeout)
+                collect(page_num, img_index, digest, run_ocr)
+            return images_data
+        
+        pool = self._get_pool()
+        pending = deque()
+        # Grace period on top of tesseract's own timeout for queueing and transfer
+        wait_timeout = self.ocr_timeout + 5
+        
+        for page_num, img_index, digest, img_data in jobs:
+            result = None
+            if needs_ocr(digest) and img_data is not None:
+                submitted.add(digest)
+                result = pool.apply_async(
+                    _ocr_image, (img_data, self.ocr_lang, self.ocr_config, self.ocr_timeout)
+                )
+            pending.append((page_num, img_index, digest, result))
+            
+            if len(pending) >= self.ocr_workers * 4:
+                page, index, key, res = pending.popleft()
+                collect(page, index, key, res and (lambda: res.get(timeout=wait_timeout)))
+        
+        while pending:
+            page, index, key, res = pending.popleft()
+            collect(page, index, key, res and (lambda: res.get(timeout=wait_timeout)))
+        
+        return images_data
+    
+    def is_table_candidate(self, page) -> bool:
+        """
+        Cheap check for ruled tables on a page using its vector drawings
+        
+        Counts horizontal and vertical ruling lines (stroked lines and thin
+        rectangles); a page needs several of each to be worth running the
+        table extractor on. Tables without any ruling lines are not detected.
+        """
+        horizontal = vertical = 0
+        
+        for path in page.get_drawings():
+            stroked = 's' in (path.get('type') or '')
+            for item in path['items']:
+                if item[0] == 'l':
+                    p1, p2 = item[1], item[2]
+                    if abs(p1.y - p2.y) < 1 and abs(p1.x - p2.x) > 10:
+                        horizontal += 1
+                    elif abs(p1.x - p2.x) < 1 and abs(p1.y - p2.y) > 10:
+                        vertical += 1
+                elif item[0] == 're':
+                    rect = item[1]
+                    if rect.height < 2 and rect.width > 10:
+                        horizontal += 1
+                    elif rect.width < 2 and rect.height > 10:
+                        vertical += 1
+                    elif stroked and rect.width > 10 and rect.height > 5:
+                        # A bordered cell contributes two lines of each kind
+                        horizontal += 2
+                        vertical += 2
+            
+            if horizontal >= self.MIN_TABLE_LINES and vertical >= self.MIN_TABLE_LINES:
+                return True
+        
+        return False
+    
+    def find_table_pages(self, pdf_path: str) -> List[int]:
+        """0-indexed numbers of the pages that look like they contain tables"""
+        with fitz.open(pdf_path) as doc:
+            return [page_num for page_num, page in enumerate(doc) if self.is_table_candidate(page)]
+    
+    def _extract_tables(self, pdf_path: str, page_nums: List[int], extractor, local_extractor=None) -> List[Dict]:
+        """
+        Run a table extractor on the given pages within the per-document time budget
+        
+        Pages are spread over the worker pool when one is configured (or run
+        in-process through local_extractor when given). Pages not finished
+        when the budget runs out are skipped and the pool is restarted so
+        they stop using CPU.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_nums: 0-indexed pages to extract tables from
+            extractor: Module-level function (pdf_path, page_num) -> list of table texts
+            local_extractor: Optional in-process function page_num -> list of table texts
+        """
+        tables_data = []
+        deadline = time.time() + self.table_time_budget
+        
+        def add(page_num, texts):
+            for text in texts:
                 tables_data.append({
-                    'page': table.page,
-                    'table_index': i,
-                    'text': table_text,
+                    'page': page_num + 1,
+                    'table_index': len(tables_data),
+                    'text': text,
                     'type': 'table',
                     'source': Path(pdf_path).name
                 })
-            
+        
+        if self.ocr_workers <= 1 or len(page_nums) <= 1:
+            run = local_extractor or (lambda page_num: extractor(pdf_path, page_num))
+            for i, page_num in enumerate(page_nums):
+                if time.time() > deadline:
+                    logger.warning(f"Table time budget spent, skipping {len(page_nums) - i} pages of {pdf_path}")
+                    break
+                try:
+                    add(page_num, run(page_num))
+                except Exception as e:
+                    logger.error(f"Failed to extract tables on page {page_num + 1}: {e}")
             return tables_data
-            
+        
+        pool = self._get_pool()
+        pending = [(page_num, pool.apply_async(extractor, (pdf_path, page_num))) for page_num in page_nums]
+        
+        for i, (page_num, result) in enumerate(pending):
+            try:
+                add(page_num, result.get(timeout=max(0.0, deadline - time.time())))
+            except multiprocessing.TimeoutError:
+                logger.warning(f"Table time budget spent, skipping {len(pending) - i} pages of {pdf_path}")
+                self.close()
+                break
+            except Exception as e:
+                logger.error(f"Failed to extract tables on page {page_num + 1}: {e}")
+        
+        return tables_data
+    
+    def extract_tables_from_pdf(self, pdf_path: str) -> List[Dict]:
+        """
+        Extract tables from PDF (requires additional libraries)
+        
+        Camelot only runs on pages that pass is_table_candidate, in parallel
+        across pages when a worker pool is configured.
+        """
+        try:
+            import camelot  # pip install camelot-py[cv]
         except ImportError:
             logger.warning("Camelot not installed. Install with: pip install camelot-py[cv]")
             return []
+        
+        try:
+            page_nums = self.find_table_pages(pdf_path)
+            return self._extract_tables(pdf_path, page_nums, _camelot_page_tables)
         except Exception as e:
             logger.error(f"Failed to extract tables: {e}")
             return []
     
+    def _iter_pages(self, doc, pdf_path: str, results: Dict, table_pages: List[int]):
+        """
+        Extract text into results page by page, yielding each page's OCR jobs
+        
+        Pages that look like they hold tables are appended to table_pages.
+        """
+        seen_xrefs = {}
+        for page_num, page in enumerate(doc):
+            # Regular text
+            try:
+                text = page.get_text()
+                if text.strip():
+                    results['text'].append({
+                        'page': page_num + 1,
+                        'content': text,
+                        'type': 'text'
+                    })
+            except Exception as e:
+                logger.error(f"Failed to extract text on page {page_num + 1}: {e}")
+            
+            # Table candidates, extracted once the page loop is done
+            try:
+                if self.is_table_candidate(page):
+                    table_pages.append(page_num)
+            except Exception as e:
+                logger.error(f"Failed to check page {page_num + 1} for tables: {e}")
+            
+            # Images, OCR'd by the caller
+            yield from self._collect_page_images(doc, page, page_num, seen_xrefs)
+    
     def process_pdf_complete(self, pdf_path: str) -> Dict:
         """
         Extract all content from PDF including text, images, and tables
+        
+        The PDF is opened once and text, image OCR and table detection all
+        work on the same page objects. Only pages with ruling lines go to the
+        table extractor, page-parallel when a worker pool is configured.
         """
         results = {
             'text': [],
@@ -127,25 +550,23 @@ class MultiModalProcessor:
             }
         }
         
-        # Extract regular text (you already have this)
         try:
             doc = fitz.open(pdf_path)
-            for page_num, page in enumerate(doc):
-                text = page.get_text()
-                if text.strip():
-                    results['text'].append({
-                        'page': page_num + 1,
-                        'content': text,
-                        'type': 'text'
-                    })
-            doc.close()
         except Exception as e:
-            logger.error(f"Failed to extract text: {e}")
-        
-        # Extract images with OCR
-        results['images'] = self.extract_images_from_pdf(pdf_path)
+            logger.error(f"Failed to open PDF {pdf_path}: {e}")
+            return results
         
-        # Extract tables
-        results['tables'] = self.extract_tables_from_pdf(pdf_path)
+        try:
+            # OCR jobs are produced as the page loop advances and consumed as
+            # they come, so text is extracted while OCR runs
+            table_pages = []
+            results['images'] = self._run_ocr(self._iter_pages(doc, pdf_path, results, table_pages), pdf_path)
+            
+            results['tables'] = self._extract_tables(
+                pdf_path, table_pages, _pymupdf_page_tables,
+                local_extractor=lambda page_num: _tables_to_text(doc[page_num].find_tables().tables)
+            )
+        finally:
+            doc.close()
         
         return results
\ No newline at end of file
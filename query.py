@@ -13,16 +13,18 @@ from config import *
 from llm_utils import get_llm, create_prompt
 # query.py (updated section)
 from hybrid_search import HybridRetriever
+from bm25_index import IncrementalBM25Index
 import pickle
-from pathlib import Path
+import threading
 from pathlib import Path
 from cache import QueryCache
+from docstore import ChunkStore
 from logger_config import setup_logger
 
 
 # Initialize logger and cache
 logger = setup_logger('rag_query')
-query_cache = QueryCache()
+query_cache = QueryCache(memory_entries=QUERY_CACHE_ENTRIES, memory_bytes=QUERY_CACHE_BYTES)
 
 def search_documents(query, k=5, use_cache=True):
     """Search for relevant documents with caching"""
@@ -64,23 +66,80 @@ def load_embeddings():
             model_kwargs={'device': 'cpu'}
         )
 
-def load_vectorstore():
-    """Load the existing vector store"""
-    embeddings = load_embeddings()
+class RetrievalEngine:
+    """
+    Process-wide owner of the embedding model, vector store and hybrid retriever
     
-    vectorstore = Chroma(
-        persist_directory=str(VECTORSTORE_DIR),
-        embedding_function=embeddings,
-        collection_name=COLLECTION_NAME
-    )
+    Each resource is created on first use and then shared, so queries no
+    longer pay for loading the SentenceTransformer model or opening Chroma.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embeddings = None
+        self._vectorstore = None
+        self._hybrid_retriever = None
+    
+    @property
+    def embeddings(self):
+        with self._lock:
+            if self._embeddings is None:
+                logger.info(f"Loading embeddings model {EMBEDDING_MODEL}")
+                self._embeddings = load_embeddings()
+            return self._embeddings
     
-    return vectorstore
+    @property
+    def vectorstore(self):
+        with self._lock:
+            if self._vectorstore is None:
+                self._vectorstore = Chroma(
+                    persist_directory=str(VECTORSTORE_DIR),
+                    embedding_function=self.embeddings,
+                    collection_name=COLLECTION_NAME
+                )
+            return self._vectorstore
+    
+    @property
+    def hybrid_retriever(self):
+        with self._lock:
+            if self._hybrid_retriever is None:
+                self._hybrid_retriever = _build_hybrid_retriever(self.vectorstore)
+            return self._hybrid_retriever
+    
+    def warm_up(self):
+        """Load the model and open the collection now instead of on the first query"""
+        self.vectorstore.similarity_search_with_score("warm up", k=1)
+        logger.info("Retrieval engine warmed up")
+    
+    def invalidate(self):
+        """
+        Drop state derived from the indexed documents (call after ingestion)
+        
+        The vector store is reopened too: ingestion may have deleted and
+        recreated the collection, leaving the old handle pointing at nothing.
+        The embedding model is kept.
+        """
+        with self._lock:
+            if self._hybrid_retriever is not None:
+                self._hybrid_retriever.close()
+            self._hybrid_retriever = None
+            self._vectorstore = None
+            query_cache.clear()
 
-def search_documents(query, k=5):
-    """Search for relevant documents"""
-    vectorstore = load_vectorstore()
-    results = vectorstore.similarity_search_with_score(query, k=k)
-    return results
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the shared RetrievalEngine, creating it on first call"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RetrievalEngine()
+        return _engine
+
+def load_vectorstore():
+    """Return the shared vector store (opened once per process)"""
+    return get_engine().vectorstore
 
 def generate_answer(question, context_docs):
     """Generate an answer using the LLM"""
@@ -95,8 +154,6 @@ def create_rag_chain():
     logger.info("Creating RAG chain")
     
     try:
-        vectorstore = load_vectorstore()
-        llm = get_llm()
         """Create a full RAG chain using LangChain"""
     
         vectorstore = load_vectorstore()
@@ -187,14 +244,33 @@ def main():
 
 
 def create_hybrid_retriever():
-    """Create hybrid retriever with cached documents"""
-    vectorstore = load_vectorstore()
+    """Return the shared hybrid retriever, built on first use"""
+    return get_engine().hybrid_retriever
+
+def _build_hybrid_retriever(vectorstore):
+    """Create hybrid retriever over the persistent BM25 index, or cached documents"""
+    # Built at ingest time and memory-mapped here
+    bm25_index = IncrementalBM25Index.load()
+    if bm25_index is not None:
+        return HybridRetriever(
+            vectorstore,
+            bm25_index=bm25_index,
+            latency_budget=HYBRID_LATENCY_BUDGET or None,
+            fusion=HYBRID_FUSION,
+            fan_out=HYBRID_FAN_OUT,
+            bm25_pruning=BM25_PRUNING,
+            phrase_filter=PHRASE_FILTER,
+            phrase_boost=PHRASE_BOOST
+        )
     
-    # Load all documents (you might want to cache this)
+    # Chunks are written to the chunk store during ingestion
+    chunk_store = ChunkStore()
     docs_cache_path = Path("cache/documents.pkl")
     
-    if docs_cache_path.exists():
-        # Load cached documents
+    if chunk_store.exists():
+        documents = chunk_store.load_documents()
+    elif docs_cache_path.exists():
+        # Cache written by older versions of ingest.py
         with open(docs_cache_path, 'rb') as f:
             documents = pickle.load(f)
     else:
@@ -203,13 +279,22 @@ def create_hybrid_retriever():
         documents = []
         # You'll need to implement this based on your vectorstore
         
-    hybrid_retriever = HybridRetriever(vectorstore, documents)
+    hybrid_retriever = HybridRetriever(
+        vectorstore,
+        documents,
+        latency_budget=HYBRID_LATENCY_BUDGET or None,
+        fusion=HYBRID_FUSION,
+        fan_out=HYBRID_FAN_OUT,
+        bm25_pruning=BM25_PRUNING,
+        phrase_filter=PHRASE_FILTER,
+        phrase_boost=PHRASE_BOOST
+    )
     return hybrid_retriever
 
-def search_documents_hybrid(query, k=5, alpha=0.5):
+def search_documents_hybrid(query, k=5, alpha=0.5, latency_budget=None, fusion=None):
     """Search using hybrid retrieval"""
     retriever = create_hybrid_retriever()
-    results = retriever.search(query, k=k, alpha=alpha)
+    results = retriever.search(query, k=k, alpha=alpha, latency_budget=latency_budget, fusion=fusion)
     return results
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+import numpy as np
+
+from bm25_index import BM25Index, IncrementalBM25Index, parse_query
+
+
+def test_scores_stay_finite_after_deletes(tmp_path):
+    """Deleting chunks that share a common word must not turn idf into NaN"""
+    index = IncrementalBM25Index(tmp_path / "bm25")
+    index.rebuild(
+        (f"doc{i}", f"acme manual page {i}" + (" pump" if i % 4 == 0 else ""))
+        for i in range(20)
+    )
+    index.save()
+    # Below max_deleted_ratio, so the tombstones are kept rather than merged away
+    index.delete(f"doc{i}" for i in range(5))
+    index.save()
+
+    index = IncrementalBM25Index.load(tmp_path / "bm25")
+    for pruned in (False, True):
+        for query in (["pump"], ["acme"], ["acme", "pump"]):
+            positions, scores = index.top_k(query, 10, pruned=pruned)
+            assert np.isfinite(scores).all()
+            assert not {index.doc_ids[i] for i in positions} & {f"doc{i}" for i in range(5)}
+        positions, _ = index.top_k(["pump"], 10, pruned=pruned)
+        assert sorted(index.doc_ids[i] for i in positions) == ["doc12", "doc16", "doc8"]
+
+
+def test_exact_phrase_respects_dropped_stopwords():
+    """A stopword between two words keeps them from matching an exact phrase"""
+    texts = ["error code 0x1F on pump", "error in code 0x1F", "the error code 0x1F"]
+    index = BM25Index.build(((str(i), text) for i, text in enumerate(texts)), positions=True)
+
+    for query, expected in (('"error code 0x1F"', [0, 2]), ('"error in code 0x1F"', [1])):
+        _, [(phrase_tokens, offsets, slop)] = parse_query(query, index.analyzer)
+        assert index.phrase_matches(phrase_tokens, slop, offsets).tolist() == expected
+
+
+def test_segments_stay_memory_mapped_under_collection_stats(tmp_path):
+    """Queries over several saved segments score them without loading their weights into RAM"""
+    index = IncrementalBM25Index(tmp_path / "bm25")
+    index.rebuild((f"a{i}", f"pump valve seal {i}" + " pump" * (i % 3)) for i in range(30))
+    index.save()
+    index.add((f"b{i}", f"valve manual {i}" + " seal" * (i % 2)) for i in range(10))
+    index.save()
+    expected = {
+        pruned: index.top_k(["pump", "seal"], 5, pruned=pruned)[1]
+        for pruned in (False, True)
+    }
+
+    index = IncrementalBM25Index.load(tmp_path / "bm25")
+    assert len(index.segments) == 2
+    for pruned in (False, True):
+        _, scores = index.top_k(["pump", "seal"], 5, pruned=pruned)
+        assert np.allclose(scores, expected[pruned], rtol=1e-5)
+        assert np.allclose(scores, expected[False], rtol=1e-5)
+    assert all(isinstance(segment.weights, np.memmap) for _, segment in index.segments)
+
+
+def test_merge_matches_fresh_build():
+    """Merging away deleted chunks gives the same index as building from the survivors"""
+    texts = ["common x", "common y", "common z", "rare1 rare2 rare3 rare4"]
+    index = BM25Index.build(((str(i), text) for i, text in enumerate(texts)), positions=True)
+    merged = BM25Index.merge([index], [np.array([True, True, True, False])])
+    fresh = BM25Index.build(((str(i), text) for i, text in enumerate(texts[:3])), positions=True)
+
+    assert sorted(merged.vocab) == sorted(fresh.vocab)
+    for query in (["common"], ["common", "x"], ["z"]):
+        assert np.allclose(merged.get_scores(query), fresh.get_scores(query))
+    assert merged.phrase_matches(["common", "y"]).tolist() == fresh.phrase_matches(["common", "y"]).tolist()
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+pytest.importorskip("pytesseract")
+
+from multimodal import MultiModalProcessor
+
+
+def _pixmap(gray):
+    """Minimal stand-in for a grayscale fitz.Pixmap"""
+    gray = np.ascontiguousarray(gray, dtype=np.uint8)
+    height, width = gray.shape
+    return SimpleNamespace(width=width, height=height, n=1, alpha=0, stride=width, samples=gray.tobytes())
+
+
+def _scan(lines, seed=0):
+    """A letter-size page at 300 dpi with `lines` lines of glyph-like 3 px strokes on noisy paper"""
+    rng = np.random.default_rng(seed)
+    page = np.clip(rng.normal(245, 4, (3300, 2550)), 0, 255)
+    for line in range(lines):
+        top = 300 + line * 60
+        for left in range(300, 2200, 22):
+            if rng.random() < 0.15:
+                continue  # space between words
+            page[top:top + 30, left:left + 3] = 20
+            page[top + rng.integers(0, 28):][:3, left:left + 14] = 20
+            page[top:top + rng.integers(10, 31), left + 11:left + 14] = 20
+    return page
+
+
+@pytest.mark.parametrize("lines", [1, 5, 40])
+def test_prefilter_keeps_sparse_text_scans(lines):
+    """A few lines of text on a large scan must still be sent to OCR"""
+    assert MultiModalProcessor()._skip_reason(_pixmap(_scan(lines))) is None
+
+
+def test_prefilter_skips_non_text_images():
+    processor = MultiModalProcessor()
+    rng = np.random.default_rng(1)
+
+    blank = _scan(0)
+    assert processor._skip_reason(_pixmap(blank)) == 'blank'
+
+    # Dust on an otherwise empty page
+    for y, x in zip(rng.integers(0, 3290, 5), rng.integers(0, 2540, 5)):
+        blank[y:y + 3, x:x + 3] = 30
+    assert processor._skip_reason(_pixmap(blank)) == 'blank'
+
+    gradient = np.tile(np.linspace(30, 230, 1200), (900, 1))
+    assert processor._skip_reason(_pixmap(gradient)) == 'no_edges'
+
+    photo = rng.integers(0, 256, (600, 800))
+    assert processor._skip_reason(_pixmap(photo)) == 'photo'
+
+    assert processor._skip_reason(_pixmap(np.full((20, 400), 255))) == 'too_small'